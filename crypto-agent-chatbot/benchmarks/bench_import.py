@@ -0,0 +1,64 @@
+"""Import-time benchmark for the modules the dashboard loads on cold start.
+
+Runs each import in a fresh interpreter with ``python -X importtime`` and
+reports the cumulative time, the packages that cost the most and whether
+the LLM stack (openai, httpx, tiktoken) was pulled in. Run from the
+project root:
+
+    python -m benchmarks.bench_import
+"""
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+# What main.py needs before any chat message is sent
+DASHBOARD_IMPORT = "from utils import api, helpers, chatbot, poller, render, timeseries, tracing"
+TARGETS = {
+    "dashboard": DASHBOARD_IMPORT,
+    "utils.chatbot": "import utils.chatbot",
+    "utils.charts": "import utils.charts",
+    "openai": "import openai",
+}
+LLM_STACK = ("openai", "httpx", "tiktoken")
+RUNS = 5
+
+LINE_RE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+def import_profile(statement):
+    """Returns (total ms, {top-level package: self ms}, LLM modules loaded) for one import."""
+    probe = f"{statement}\nimport sys\nprint(','.join(m for m in {LLM_STACK!r} if m in sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        capture_output=True, text=True, check=True,
+    )
+    packages = defaultdict(int)
+    total = 0
+    for line in result.stderr.splitlines():
+        match = LINE_RE.match(line)
+        if not match:
+            continue
+        self_us, cumulative, indent, name = match.groups()
+        packages[name.split(".")[0]] += int(self_us)
+        if len(indent) == 1:  # imported directly by the statement, not nested
+            total += int(cumulative)
+    loaded = [name for name in result.stdout.strip().split(",") if name]
+    return total / 1000, {name: us / 1000 for name, us in packages.items()}, loaded
+
+def main():
+    for label, statement in TARGETS.items():
+        totals = []
+        try:
+            for _ in range(RUNS):
+                total, packages, loaded = import_profile(statement)
+                totals.append(total)
+        except subprocess.CalledProcessError as e:
+            print(f"{label:<15} failed: {e.stderr.strip().splitlines()[-1]}")
+            continue
+        heaviest = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:6]
+        print(f"{label:<15} median {statistics.median(totals):8.1f} ms   LLM stack loaded: {', '.join(loaded) or 'none'}")
+        print("    " + ", ".join(f"{name} {ms:.0f} ms" for name, ms in heaviest))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Benchmark: typed one-pass ticker ingestion vs. the old DataFrame build.
+
+Both sides end with the table the dashboard shows: the old per-column
+.apply formatting, and now render.TableRenderModel. "first" is a cold
+render that formats every cell; "refresh" re-renders a new snapshot whose
+values are unchanged, so no cell is formatted again. Both include
+parse_tickers. The renderer's per-row diff costs more than .apply on a
+cold render and roughly breaks even on a refresh.
+
+Run from the project root:
+
+    python -m benchmarks.bench_ingest
+"""
+import itertools
+import random
+import timeit
+
+import pandas as pd
+
+from utils import ingest, render
+
+NUMERIC_COLUMNS = [
+    'price_usd', 'percent_change_24h', 'percent_change_1h',
+    'percent_change_7d', 'market_cap_usd', 'volume24'
+]
+
+def make_tickers(n, seed=7):
+    """Synthesizes /tickers/ rows shaped like CoinLore's, numbers as strings."""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        price = rng.lognormvariate(0, 3)
+        supply = rng.uniform(1e6, 1e10)
+        rows.append({
+            "id": str(90 + i), "symbol": f"C{i % 5000}", "name": f"Coin {i}", "nameid": f"coin-{i}",
+            "rank": i + 1, "price_usd": f"{price:.4f}",
+            "percent_change_24h": f"{rng.uniform(-20, 20):.2f}", "percent_change_1h": f"{rng.uniform(-3, 3):.2f}",
+            "percent_change_7d": f"{rng.uniform(-40, 40):.2f}", "price_btc": f"{price / 60000:.8f}",
+            "market_cap_usd": f"{price * supply:.2f}", "volume24": rng.uniform(1e3, 1e10),
+            "volume24a": rng.uniform(1e3, 1e10), "csupply": f"{supply:.2f}",
+            "tsupply": f"{supply:.2f}", "msupply": "",
+        })
+    return rows
+
+def legacy(rows):
+    """load_data's old path plus the dashboard's .apply formatting."""
+    df = pd.DataFrame(rows)
+    for col in NUMERIC_COLUMNS:
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+    out = df.copy()
+    out['price_usd'] = out['price_usd'].apply(lambda x: f"${float(x):,.2f}")
+    out['market_cap_usd'] = out['market_cap_usd'].apply(lambda x: f"${float(x):,.0f}")
+    out['percent_change_24h'] = out['percent_change_24h'].apply(lambda x: f"{float(x):+.2f}%")
+    out['volume24'] = out['volume24'].apply(lambda x: f"${float(x):,.0f}")
+    return out
+
+def typed(rows):
+    """parse_tickers plus the dashboard's table renderer, formatting every cell."""
+    render.format_value.cache_clear()
+    return render.TableRenderModel().render(ingest.parse_tickers(rows), version=1)
+
+def refresh(table, rows, versions):
+    """A poller tick: parse the new snapshot and re-render it over the last one."""
+    return table.render(ingest.parse_tickers(rows), version=next(versions))
+
+def main(repeat=5):
+    print(f"{'rows':>7} {'legacy ms':>10} {'first ms':>10} {'refresh ms':>11}")
+    for n in (100, 1_000, 10_000):
+        rows = make_tickers(n)
+        number = max(1, 2_000 // n)
+        old = min(timeit.repeat(lambda: legacy(rows), number=number, repeat=repeat)) / number
+        first = min(timeit.repeat(lambda: typed(rows), number=number, repeat=repeat)) / number
+        table, versions = render.TableRenderModel(), itertools.count()
+        refresh(table, rows, versions)
+        warm = min(timeit.repeat(lambda: refresh(table, rows, versions), number=number, repeat=repeat)) / number
+        print(f"{n:>7} {old * 1e3:>10.2f} {first * 1e3:>10.2f} {warm * 1e3:>11.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Benchmark: walking the full /tickers/ universe serially vs. the paginator.
+
+Starts the local fake CoinLore with several thousand synthetic coins and
+a fixed per-request latency, then collects every coin both ways, as the
+coin index does, reporting wall time and peak traced memory. Run from the project root:
+
+    python -m benchmarks.bench_paginate --coins 5000 --latency-ms 50
+
+The token-bucket rate limit is lifted for the run; against the real API
+COINLORE_RATE_LIMIT bounds how fast any walk can go.
+"""
+import argparse
+import os
+import time
+import tracemalloc
+
+from loadtest.fake_server import start_server
+
+def serial(api, max_coins, page_size=100):
+    """The old approach: one cached get_top_coins page of raw rows after another."""
+    rows = []
+    for start in range(0, max_coins, page_size):
+        data = api.get_top_coins(limit=page_size, start=start).get('data', [])
+        rows.extend(data)
+        if len(data) < page_size:
+            break
+    return rows
+
+def measure(build, clear):
+    clear()
+    started = time.perf_counter()
+    df = build()
+    elapsed = time.perf_counter() - started
+    clear()
+    tracemalloc.start()
+    build()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(df), elapsed, peak / 2**20
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--coins", type=int, default=5000)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    args = parser.parse_args()
+
+    server, _ = start_server(latency_ms=args.latency_ms, jitter_ms=0, universe=args.coins)
+    os.environ["COINLORE_API_URL"] = f"http://127.0.0.1:{server.server_port}/api"
+    os.environ["COINLORE_RATE_LIMIT"] = "1000"
+    os.environ["COINLORE_RATE_BURST"] = "1000"
+    from utils import api, paginator
+
+    runs = {"serial, raw rows": lambda: serial(api, args.coins)}
+    for concurrency in (1, 4, 8):
+        runs[f"paginator, {concurrency} in flight"] = (
+            lambda c=concurrency: list(paginator.iter_tickers(args.coins, concurrency=c))
+        )
+
+    print(f"{args.coins} coins, {args.latency_ms:.0f} ms per page\n")
+    print(f"{'strategy':<26} {'rows':>6} {'seconds':>8} {'peak MiB':>9}")
+    for label, build in runs.items():
+        rows, elapsed, peak = measure(build, api.response_cache.clear)
+        print(f"{label:<26} {rows:>6} {elapsed:>8.2f} {peak:>9.1f}")
+
+if __name__ == "__main__":
+    main()
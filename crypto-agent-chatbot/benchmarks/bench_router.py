@@ -0,0 +1,97 @@
+"""Micro-benchmark: compiled intent router vs. the old substring cascade.
+
+The router is slower per message than the hard-coded cascade, which
+only knew seven coins; the "scaled" column is that cascade over the whole
+coin list. Everyday questions that contain real ticker symbols must
+still route to the model. Run from the project root:
+
+    python -m benchmarks.bench_router
+"""
+import timeit
+
+from utils.router import IntentRouter
+
+MESSAGES = [
+    "What's the current Bitcoin price?",
+    "Show me the top 10 cryptocurrencies",
+    "What are the global market statistics?",
+    "Tell me about Ethereum",
+    "Compare the price of eth, xrp and doge",
+    "How does proof of stake work?",
+    "What's the GAS price?",
+]
+
+# Everyday questions containing real tickers (TIME, GAS, AI, WIN): all must route to "chat"
+NEGATIVE_MESSAGES = [
+    "what time is it in tokyo",
+    "should I buy some gas for my car",
+    "can you explain how ai works",
+    "how do I win at chess",
+    "is it too hot to go out",
+    "just give me a bond yield example",
+]
+
+# A ranked universe the size of the coin index, without touching the network
+COINS = [("BTC", "Bitcoin"), ("ETH", "Ethereum"), ("BNB", "Binance Coin"), ("XRP", "XRP"), ("DOGE", "Dogecoin")]
+COINS += [("TIME", "Chrono.tech"), ("GAS", "Gas"), ("AI", "Sleepless AI"), ("SUN", "Sun Token"), ("HOT", "Holo"),
+          ("WIN", "WINkLink"), ("JST", "JUST"), ("BOND", "BarnBridge")]
+COINS += [(f"C{i}", f"Coin Number {i}") for i in range(len(COINS), 500)]
+
+def legacy_route(user_message):
+    """The substring cascade run_conversation used before the router."""
+    if "price" in user_message and ("bitcoin" in user_message or "btc" in user_message):
+        return ("price", ("btc",))
+    elif "price" in user_message:
+        for coin in ["eth", "ethereum", "bnb", "binance", "xrp", "doge", "dogecoin"]:
+            if coin in user_message:
+                return ("price", (coin,))
+    elif "top" in user_message and any(str(i) for i in range(1, 101) if str(i) in user_message):
+        for i in range(1, 101):
+            if str(i) in user_message:
+                return ("top", i)
+    elif "global" in user_message or "market" in user_message or "stats" in user_message:
+        return ("global",)
+    elif any(coin in user_message for coin in ["bitcoin", "btc", "ethereum", "eth", "bnb", "xrp", "doge"]):
+        for coin in ["btc", "eth", "bnb", "xrp", "doge"]:
+            if coin in user_message:
+                return ("details", (coin,))
+    return ("chat",)
+
+COIN_TERMS = sorted({term for pair in COINS for term in (pair[0].lower(), pair[1].lower())}, key=len, reverse=True)
+
+def legacy_scaled_route(user_message):
+    """The same cascade, but scanning every indexed coin the way it scans its hard-coded list."""
+    coins = [term for term in COIN_TERMS if term in user_message]
+    if "price" in user_message and coins:
+        return ("price", tuple(coins))
+    if "top" in user_message:
+        for i in range(1, 101):
+            if str(i) in user_message:
+                return ("top", i)
+    if "global" in user_message or "market" in user_message or "stats" in user_message:
+        return ("global",)
+    if coins:
+        return ("details", tuple(coins))
+    return ("chat",)
+
+def main(number=20000):
+    build_time = timeit.timeit(lambda: IntentRouter.from_coins(COINS), number=5) / 5
+    router = IntentRouter.from_coins(COINS)
+    hijacked = [(m, router.route(m)) for m in NEGATIVE_MESSAGES if router.route(m).kind != "chat"]
+    assert not hijacked, f"everyday questions routed to coins: {hijacked}"
+    print(f"{len(NEGATIVE_MESSAGES)} everyday questions with ticker words all route to chat")
+
+    print(f"router build ({len(COINS)} coins): {build_time * 1e3:.2f} ms (once per index refresh)\n")
+    print(f"{'message':<42} {'legacy µs':>10} {'scaled µs':>10} {'router µs':>10}  intent")
+    for message in MESSAGES:
+        # The cascade ran on the lowercased message; the router needs the original case
+        lowered = message.lower()
+        legacy = timeit.timeit(lambda: legacy_route(lowered), number=number) / number
+        scaled = timeit.timeit(lambda: legacy_scaled_route(lowered), number=number // 10) / (number // 10)
+        routed = timeit.timeit(lambda: router.route(message), number=number) / number
+        print(f"{message[:40]:<42} {legacy * 1e6:>10.2f} {scaled * 1e6:>10.2f} {routed * 1e6:>10.2f}  {router.route(message)}")
+    print("\nlegacy: 7 hard-coded coins, faster but blind to the rest; scaled: the cascade over all indexed coins")
+    print(f"legacy 'top 10' answer: {legacy_route('show me the top 10 cryptocurrencies')}")
+
+if __name__ == "__main__":
+    main()
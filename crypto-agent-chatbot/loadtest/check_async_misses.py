@@ -0,0 +1,49 @@
+"""Checks that many concurrent async cache misses cannot starve the event loop.
+
+Asks for details on more coins than the default thread pool has workers
+(cpu count + 4), on a cold process so every market summary misses. Each
+miss parks a worker thread until its request finishes on the event loop,
+so the request itself must never need a worker of its own:
+
+    python -m loadtest.check_async_misses
+"""
+import os
+import threading
+import time
+
+from .fake_server import start_server
+
+TIMEOUT = 15
+
+def main():
+    coins = (os.cpu_count() or 1) + 4 + 4
+    server, upstream = start_server(latency_ms=20, jitter_ms=0, universe=max(coins, 16))
+    # Must be set before the app modules read them at import time
+    os.environ["COINLORE_API_URL"] = f"http://127.0.0.1:{server.server_port}/api"
+    os.environ["COINLORE_RATE_LIMIT"] = "1000"
+    os.environ["COINLORE_RATE_BURST"] = "1000"
+    from utils import answer_cache, chatbot, coin_index
+
+    symbols = [coin.symbol for coin in sorted(coin_index.get_index().coins.values(), key=lambda c: c.rank)][:coins]
+    result = {}
+
+    def ask():
+        result["answer"] = chatbot.get_many_coin_details(symbols)
+
+    started = time.perf_counter()
+    worker = threading.Thread(target=ask, daemon=True)
+    worker.start()
+    worker.join(TIMEOUT)
+    elapsed = time.perf_counter() - started
+    print(f"{len(symbols)} coins, upstream: {upstream.stats()['requests']}, took {elapsed:.2f}s")
+
+    if worker.is_alive():
+        print(f"FAIL: details for {len(symbols)} coins still pending after {TIMEOUT}s")
+        os._exit(1)  # the stuck worker threads would keep the process alive
+    answer = result["answer"]
+    assert not answer_cache.has_failure(answer), answer
+    assert answer.count("Here's what I found about") == len(symbols), answer
+    print(f"ok: {len(symbols)} concurrent misses answered")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""Checks that chat questions reach the right data answers through the chatbot.
+
+Runs each question through chatbot.answer_data_question, the path the
+app uses, against an embedded fake server, so the router sees the
+message exactly as the user typed it:
+
+    python -m loadtest.check_routing
+"""
+import os
+
+from .fake_server import start_server
+
+# question -> coins whose details must be in the answer (None: left to the model)
+CASES = {
+    "Compare SOL and AVAX": ("Solana (SOL)", "Avalanche (AVAX)"),
+    "How is ADA doing?": ("Cardano (ADA)",),
+    "Tell me about Solana and Cardano": ("Solana (SOL)", "Cardano (ADA)"),
+    "Tell me about Ethereum": ("Ethereum (ETH)",),
+    "what time is it in tokyo": None,
+    "how do I win at chess": None,
+}
+
+def main():
+    server, _ = start_server(latency_ms=0, jitter_ms=0)
+    # Must be set before the app modules read it at import time
+    os.environ["COINLORE_API_URL"] = f"http://127.0.0.1:{server.server_port}/api"
+    from utils import chatbot
+
+    failures = []
+    for question, expected in CASES.items():
+        answer = chatbot.answer_data_question(question)
+        if expected is None:
+            ok = answer is None
+        else:
+            ok = answer is not None and all(f"found about {coin}" in answer for coin in expected)
+        print(f"{'ok  ' if ok else 'FAIL'} {question!r}")
+        if not ok:
+            failures.append((question, answer))
+    assert not failures, failures
+    print(f"ok: {len(CASES)} questions routed as expected")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""Checks that a CoinLore 429 with Retry-After reaches the shared scheduler.
+
+Starts an embedded fake server and makes it answer the next request
+with 429. The pooled session must hand that response straight back, so
+api.request_json calls scheduler.throttle, pauses every lane for the
+Retry-After delay and retries once the pause is over:
+
+    python -m loadtest.check_throttle
+"""
+import os
+import time
+
+from .fake_server import start_server
+
+RETRY_AFTER = 1
+
+def main():
+    server, upstream = start_server(latency_ms=0, jitter_ms=0)
+    # Must be set before the app modules read it at import time
+    os.environ["COINLORE_API_URL"] = f"http://127.0.0.1:{server.server_port}/api"
+    from utils import api
+    from utils.scheduler import scheduler
+
+    upstream.throttle(1, RETRY_AFTER)
+    started = time.perf_counter()
+    data = api.request_json(f"{api.COINLORE_API_URL}/global/")
+    elapsed = time.perf_counter() - started
+    counts = upstream.stats()["requests"]
+    print(f"upstream: {counts}, scheduler throttled: {scheduler.throttled}, took {elapsed:.2f}s")
+
+    # The adapter must not retry the 429 itself: one throttled answer, then one real one
+    assert counts == {"throttled": 1, "global": 1}, counts
+    assert scheduler.throttled == 1, scheduler.throttled
+    assert elapsed >= RETRY_AFTER * 0.9, elapsed
+    assert data is not None
+    print("ok: the 429 reached scheduler.throttle")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Simulates concurrent chat users against the local fake upstream.
+
+Each simulated user runs the sidebar example questions through
+chatbot.run_conversation, like a Streamlit session would, and the driver
+reports latency percentiles and how many upstream requests were made:
+
+    python -m loadtest.driver --users 50 --rounds 3 --latency-ms 80
+
+By default an embedded fake server is started; pass --server to target
+one started separately with python -m loadtest.fake_server.
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from urllib.request import Request, urlopen
+
+from .fake_server import start_server
+
+FREE_FORM_QUESTION = "Explain what a stablecoin is"
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = max(int(round(pct / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(index, len(sorted_values) - 1)]
+
+def summarize(latencies):
+    values = sorted(latencies)
+    return {
+        "count": len(values),
+        "p50_ms": percentile(values, 50) * 1000,
+        "p95_ms": percentile(values, 95) * 1000,
+        "p99_ms": percentile(values, 99) * 1000,
+        "max_ms": (values[-1] if values else 0.0) * 1000,
+    }
+
+def fetch_server_stats(server_url, reset=False):
+    if reset:
+        urlopen(Request(f"{server_url}/__reset", data=b"{}", method="POST")).read()
+        return None
+    return json.loads(urlopen(f"{server_url}/__stats").read())
+
+def run_user(chatbot, questions, rounds, stream, results, start_gate):
+    """One simulated session: a fresh history and context window, asking every question."""
+    messages = [{"role": "assistant", "content": "Hi! I'm your crypto AI assistant. How can I help you today?"}]
+    context = chatbot.ContextWindow()
+    start_gate.wait()
+    for _ in range(rounds):
+        for question in questions:
+            messages.append({"role": "user", "content": question})
+            started = time.perf_counter()
+            if stream:
+                first_chunk_at = None
+                reply = ""
+                for chunk in chatbot.run_conversation_stream(messages, context):
+                    if first_chunk_at is None:
+                        first_chunk_at = time.perf_counter()
+                    reply += chunk
+                results["first_chunk"][question].append(first_chunk_at - started)
+            else:
+                reply = chatbot.run_conversation(messages, context)["content"]
+            results["total"][question].append(time.perf_counter() - started)
+            messages.append({"role": "assistant", "content": reply})
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=1, help="times each user asks the question set")
+    parser.add_argument("--server", help="URL of an already running fake server")
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--jitter-ms", type=float, default=10)
+    parser.add_argument("--llm-latency-ms", type=float, default=20)
+    parser.add_argument("--free-form", action="store_true", help=f"also ask {FREE_FORM_QUESTION!r} (model fallback)")
+    parser.add_argument("--stream", action="store_true", help="use run_conversation_stream and record first-chunk latency")
+    args = parser.parse_args()
+
+    if args.server:
+        server_url = args.server.rstrip("/")
+    else:
+        server, _ = start_server(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, llm_latency_ms=args.llm_latency_ms)
+        server_url = f"http://127.0.0.1:{server.server_port}"
+
+    # Must be set before the app modules read them at import time
+    os.environ["COINLORE_API_URL"] = f"{server_url}/api"
+    os.environ["OPENROUTER_BASE_URL"] = f"{server_url}/v1"
+    os.environ.setdefault("OPENROUTER_API_KEY", "loadtest")
+    from utils import api, chatbot, coin_index, markets, poller
+
+    # Warm the process-wide pieces once, as a running app would have
+    coin_index.get_index()
+    poller.get_snapshot()
+    fetch_server_stats(server_url, reset=True)
+
+    questions = list(chatbot.EXAMPLE_QUESTIONS) + ([FREE_FORM_QUESTION] if args.free_form else [])
+    results = {"total": defaultdict(list), "first_chunk": defaultdict(list)}
+    start_gate = threading.Event()
+    users = [
+        threading.Thread(target=run_user, args=(chatbot, questions, args.rounds, args.stream, results, start_gate))
+        for _ in range(args.users)
+    ]
+    for user in users:
+        user.start()
+    started = time.perf_counter()
+    start_gate.set()
+    for user in users:
+        user.join()
+    elapsed = time.perf_counter() - started
+
+    print(f"{args.users} users x {args.rounds} round(s) x {len(questions)} questions in {elapsed:.2f}s\n")
+    print(f"{'question':<42} {'n':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for question in questions:
+        s = summarize(results["total"][question])
+        print(f"{question[:40]:<42} {s['count']:>5} {s['p50_ms']:>9.1f} {s['p95_ms']:>9.1f} {s['p99_ms']:>9.1f}")
+        if args.stream:
+            f = summarize(results["first_chunk"][question])
+            print(f"{'  first chunk':<42} {f['count']:>5} {f['p50_ms']:>9.1f} {f['p95_ms']:>9.1f} {f['p99_ms']:>9.1f}")
+    overall = summarize([v for values in results["total"].values() for v in values])
+    print(f"{'all':<42} {overall['count']:>5} {overall['p50_ms']:>9.1f} {overall['p95_ms']:>9.1f} {overall['p99_ms']:>9.1f}")
+
+    upstream = fetch_server_stats(server_url)
+    print(f"\nupstream requests: {upstream['total']} {upstream['requests']}")
+    print(f"connections: {api.get_connection_stats()}")
+    print(f"response cache: {api.get_cache_stats()}")
+    print(f"answer cache: {chatbot.get_answer_cache_stats()}")
+    print(f"market summaries: {markets.market_service.stats()}")
+    print(f"scheduler: {json.dumps(api.get_scheduler_stats(), default=float)}")
+
+if __name__ == "__main__":
+    main()
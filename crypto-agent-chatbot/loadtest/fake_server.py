@@ -0,0 +1,220 @@
+"""Local stand-in for CoinLore and the OpenRouter chat-completions API.
+
+Replays the recorded responses in loadtest/fixtures with configurable
+latency and counts every request it serves:
+
+    python -m loadtest.fake_server --port 8765 --latency-ms 80 --llm-latency-ms 40
+
+Point the app at it with
+COINLORE_API_URL=http://127.0.0.1:8765/api and
+OPENROUTER_BASE_URL=http://127.0.0.1:8765/v1.
+GET /__stats returns the request counters and POST /__reset clears them.
+POST /__throttle {"count": n, "retry_after": s} answers the next n
+CoinLore requests with 429 and that Retry-After.
+"""
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name)) as f:
+        return json.load(f)
+
+class FakeUpstream:
+    """Fixture data, latency settings and request counters shared by all handlers."""
+
+    def __init__(self, latency_ms=50, jitter_ms=10, llm_latency_ms=30, llm_tokens=40, universe=0):
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.llm_latency = llm_latency_ms / 1000
+        self.llm_tokens = llm_tokens
+        self.tickers = load_fixture("tickers.json")
+        if universe > len(self.tickers["data"]):
+            self.tickers["data"] += synthetic_tickers(self.tickers["data"], universe)
+            self.tickers["info"]["coins_num"] = universe
+        self.global_stats = load_fixture("global.json")
+        self.markets = load_fixture("markets.json")
+        self.social_stats = load_fixture("social_stats.json")
+        self.chat_reply = load_fixture("chat_completion.json")["content"]
+        self.counts = Counter()
+        self.throttle_remaining = 0
+        self.throttle_retry_after = 1
+        self._lock = threading.Lock()
+
+    def count(self, route):
+        with self._lock:
+            self.counts[route] += 1
+
+    def throttle(self, count, retry_after=1):
+        """Makes the next ``count`` CoinLore requests answer 429."""
+        with self._lock:
+            self.throttle_remaining = count
+            self.throttle_retry_after = retry_after
+
+    def take_throttle(self):
+        """Returns the Retry-After to send if this request should be throttled, else None."""
+        with self._lock:
+            if self.throttle_remaining <= 0:
+                return None
+            self.throttle_remaining -= 1
+            self.counts["throttled"] += 1
+            return self.throttle_retry_after
+
+    def delay(self):
+        time.sleep(max(self.latency + random.uniform(-self.jitter, self.jitter), 0))
+
+    def coinlore(self, path, query):
+        """Returns (route, payload) for a CoinLore path, or (None, None)."""
+        if path == "/api/global/":
+            return "global", self.global_stats
+        if path == "/api/tickers/":
+            start = int(query.get("start", ["0"])[0])
+            limit = int(query.get("limit", ["100"])[0])
+            return "tickers", {"data": self.tickers["data"][start:start + limit], "info": self.tickers["info"]}
+        if path == "/api/ticker/":
+            ids = set(query.get("id", [""])[0].split(","))
+            return "ticker", [row for row in self.tickers["data"] if row["id"] in ids]
+        if path == "/api/coin/markets/":
+            return "markets", self.markets
+        if path == "/api/coin/social_stats/":
+            return "social_stats", self.social_stats
+        return None, None
+
+    def stats(self):
+        with self._lock:
+            counts = dict(self.counts)
+        return {"requests": counts, "total": sum(counts.values())}
+
+    def reset(self):
+        with self._lock:
+            self.counts.clear()
+
+def synthetic_tickers(recorded, universe):
+    """Made-up coins ranked after the recorded ones, for paging through thousands of coins."""
+    extra = []
+    for rank in range(len(recorded) + 1, universe + 1):
+        row = dict(recorded[rank % len(recorded)])
+        row.update(id=str(100000 + rank), symbol=f"SYN{rank}", name=f"Synthetic {rank}", nameid=f"synthetic-{rank}", rank=rank)
+        extra.append(row)
+    return extra
+
+def completion_chunk(content, finish_reason=None):
+    return {
+        "id": "chatcmpl-loadtest",
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": "loadtest",
+        "choices": [{"index": 0, "delta": {"content": content} if content else {}, "finish_reason": finish_reason}],
+    }
+
+def make_handler(upstream):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like the real services
+
+        def log_message(self, *args):
+            pass
+
+        def send_json(self, payload, status=200, headers=None):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == "/__stats":
+                return self.send_json(upstream.stats())
+            route, payload = upstream.coinlore(url.path, parse_qs(url.query))
+            if route is None:
+                return self.send_json({"error": "not found"}, 404)
+            retry_after = upstream.take_throttle()
+            if retry_after is not None:
+                return self.send_json({"error": "rate limited"}, 429, {"Retry-After": str(retry_after)})
+            upstream.count(route)
+            upstream.delay()
+            self.send_json(payload)
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            if url.path == "/__reset":
+                upstream.reset()
+                return self.send_json({"ok": True})
+            if url.path == "/__throttle":
+                upstream.throttle(int(body.get("count", 1)), body.get("retry_after", 1))
+                return self.send_json({"ok": True})
+            if url.path != "/v1/chat/completions":
+                return self.send_json({"error": "not found"}, 404)
+            upstream.count("chat_completions")
+            upstream.delay()
+            words = upstream.chat_reply.split(" ")[:upstream.llm_tokens]
+            if not body.get("stream"):
+                time.sleep(upstream.llm_latency * len(words))
+                return self.send_json({
+                    "id": "chatcmpl-loadtest",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": "loadtest",
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": " ".join(words)}}],
+                })
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.close_connection = True
+            try:
+                for i, word in enumerate(words):
+                    time.sleep(upstream.llm_latency)
+                    chunk = completion_chunk(word if i == 0 else " " + word)
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                    self.wfile.flush()
+                self.wfile.write(f"data: {json.dumps(completion_chunk(None, 'stop'))}\n\ndata: [DONE]\n\n".encode())
+                self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                upstream.count("chat_disconnects")  # the client closed the stream early
+
+    return Handler
+
+def start_server(host="127.0.0.1", port=0, **settings):
+    """Starts the fake upstream on a daemon thread; returns (server, upstream)."""
+    upstream = FakeUpstream(**settings)
+    server = ThreadingHTTPServer((host, port), make_handler(upstream))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="fake-upstream", daemon=True).start()
+    return server, upstream
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=50, help="CoinLore response latency")
+    parser.add_argument("--jitter-ms", type=float, default=10)
+    parser.add_argument("--llm-latency-ms", type=float, default=30, help="delay per streamed token")
+    parser.add_argument("--llm-tokens", type=int, default=40)
+    parser.add_argument("--universe", type=int, default=0, help="pad /tickers/ with synthetic coins up to this many")
+    args = parser.parse_args()
+    server, _ = start_server(
+        args.host, args.port, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        llm_latency_ms=args.llm_latency_ms, llm_tokens=args.llm_tokens, universe=args.universe,
+    )
+    print(f"Fake CoinLore/OpenRouter listening on http://{args.host}:{server.server_port}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,9 @@
 import streamlit as st
-import pandas as pd
 from streamlit_chat import message
-from utils import api, helpers, chatbot
-import asyncio
+# utils.charts (plotly) is imported where a chart is drawn, and the
+# chatbot loads openai on its first model call, so the first dashboard
+# render does not pay for either.
+from utils import helpers, chatbot, poller, render, timeseries, tracing
 
 # --- Page Config ---
 st.set_page_config(
@@ -16,35 +17,21 @@ st.set_page_config(
 helpers.load_css("styles/style.css")
 st.markdown(helpers.get_footer(), unsafe_allow_html=True)
 
-# --- Data Caching ---
-@st.cache_data(ttl=300, show_spinner=False)
-def load_data():
-    """Loads and caches data from the CoinLore API."""
-    try:
-        global_stats = api.get_global_stats()
-        top_100_data = api.get_top_coins(100)
-        df = pd.DataFrame(top_100_data.get('data', []))
-        if not df.empty:
-            numeric_columns = [
-                'price_usd', 'percent_change_24h', 'percent_change_1h',
-                'percent_change_7d', 'market_cap_usd', 'volume24'
-            ]
-            for col in numeric_columns:
-                if col in df.columns:
-                    df[col] = pd.to_numeric(df[col], errors='coerce')
-        
-        info = top_100_data.get('info', {})
-        return global_stats, df, info
-    except Exception as e:
-        st.error(f"Error loading data: {str(e)}")
-        return None, pd.DataFrame(), {}
-
-# Load data at startup
-global_stats, df_coins, api_info = load_data()
+# --- Market Data ---
+# A background poller refreshes one shared snapshot per process, so page
+# renders read from memory instead of waiting on CoinLore.
+# Every published snapshot is also appended to the local price history
+poller.get_poller().add_listener(timeseries.get_store().record_snapshot)
+snapshot = poller.get_snapshot()
+global_stats, df_coins, api_info = list(snapshot.global_stats), snapshot.df, snapshot.info
 
 # --- Sidebar ---
 with st.sidebar:
     st.title("🤖 Crypto AI")
+    if snapshot.fetched_at:
+        st.caption(f"🕒 Market data updated {helpers.format_age(snapshot.age_seconds)} ago")
+    else:
+        st.caption("🕒 Market data is loading...")
     if global_stats:
         stats = global_stats[0]
         st.subheader("📊 Global Market Stats")
@@ -58,32 +45,28 @@ with st.sidebar:
 
     if not df_coins.empty:
         st.subheader("💎 Top 5 Coins")
-        for _, coin in df_coins.head().iterrows():
-            price = float(coin['price_usd'])
-            change = float(coin['percent_change_24h'])
-            delta_color = "green" if change > 0 else "red"
-            st.markdown(f"""
-            <div class="coin-card">
-                <span class="coin-symbol">{coin['symbol']}</span>
-                <span class="coin-price">${price:,.2f}</span>
-                <span class="coin-change" style="color: {delta_color}">{change:+.2f}%</span>
-            </div>
-            """, unsafe_allow_html=True)
+        # Card HTML is cached per (symbol, price, change), so unchanged cards cost a lookup
+        st.markdown(render.render_coin_cards(df_coins.head()), unsafe_allow_html=True)
 
     st.subheader("❓ Example Questions")
-    example_questions = [
-        "What's the current Bitcoin price?",
-        "Show me the top 10 cryptocurrencies",
-        "What are the global market statistics?",
-        "Tell me about Ethereum"
-    ]
-    for q in example_questions:
+    for q in chatbot.EXAMPLE_QUESTIONS:
         if st.button(q, key=f"btn_{q}"):
             if "messages" not in st.session_state:
                 st.session_state.messages = []
             st.session_state.messages.append({"role": "user", "content": q})
             st.rerun()
 
+    # Optional waterfall of the spans recorded for this session's last chat reply
+    if st.checkbox("🔍 Show request trace", key="show_trace"):
+        last_trace = st.session_state.get("last_trace")
+        if last_trace and last_trace.spans:
+            rows = last_trace.waterfall()
+            st.caption(f"{last_trace.name}: {rows[0]['duration_ms']:.0f} ms, {len(rows)} spans")
+            from utils import charts
+            st.plotly_chart(charts.create_trace_waterfall(rows), use_container_width=True)
+        else:
+            st.caption("Ask a question to record a trace.")
+
 # --- Main Content ---
 tab1, tab2 = st.tabs(["💰 Dashboard", "💬 AI Chat"])
 
@@ -92,31 +75,32 @@ with tab1:
     if global_stats and not df_coins.empty:
         # Data Table with improved styling
         st.markdown("### 📈 Top 20 Cryptocurrencies")
-        df_display = df_coins.head(20).copy()
-        
-        # Format the columns
-        df_display['price_usd'] = df_display['price_usd'].apply(lambda x: f"${float(x):,.2f}")
-        df_display['market_cap_usd'] = df_display['market_cap_usd'].apply(lambda x: f"${float(x):,.0f}")
-        df_display['percent_change_24h'] = df_display['percent_change_24h'].apply(lambda x: f"{float(x):+.2f}%")
-        df_display['volume24'] = df_display['volume24'].apply(lambda x: f"${float(x):,.0f}")
-        
-        # Rename columns for display
-        df_display = df_display.rename(columns={
-            'rank': 'Rank',
-            'symbol': 'Symbol',
-            'name': 'Name',
-            'price_usd': 'Price',
-            'percent_change_24h': '24h Change',
-            'market_cap_usd': 'Market Cap',
-            'volume24': '24h Volume'
-        })
+        # Only cells that changed since the last snapshot are re-formatted
+        df_display = render.market_table.render(df_coins.head(20), snapshot.fetched_at)
         
         st.dataframe(
-            df_display[['Rank', 'Symbol', 'Name', 'Price', '24h Change', 'Market Cap', '24h Volume']],
+            df_display,
             hide_index=True,
             use_container_width=True
         )
 
+        # Price history from the local store, downsampled before plotting
+        st.markdown("### 📉 Price History")
+        symbols = dict(zip(df_coins['id'], df_coins['symbol'].astype(str)))
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            selected = st.multiselect(
+                "Coins", list(symbols), default=list(symbols)[:5], format_func=symbols.get
+            )
+        with col2:
+            days = st.selectbox("Period", [1, 7, 30, 90], index=1, format_func=lambda d: f"{d} days")
+        history = timeseries.get_store().get_chart_series(selected, days)
+        if history:
+            from utils import charts
+            st.plotly_chart(charts.create_price_history_chart(history, symbols), use_container_width=True)
+        else:
+            st.info("Price history builds up while the app runs; check back after a few refreshes.")
+
 with tab2:
     st.header("AI Crypto Assistant")
     
@@ -126,6 +110,10 @@ with tab2:
             {"role": "assistant", "content": "Hi! I'm your crypto AI assistant. How can I help you today?"}
         ]
 
+    # Per-session prompt window: recent turns plus a rolling summary of older ones
+    if "context_window" not in st.session_state:
+        st.session_state.context_window = chatbot.ContextWindow()
+
     # Chat container
     chat_container = st.container()
     
@@ -147,7 +135,19 @@ with tab2:
     with input_container:
         if prompt := st.chat_input("Ask me anything about crypto...", key="chat_input"):
             st.session_state.messages.append({"role": "user", "content": prompt})
-            with st.spinner("Thinking..."):
-                response_message = chatbot.run_conversation(st.session_state.messages)
-                st.session_state.messages.append(response_message)
-                st.rerun()
+            st.rerun()
+
+    # Answer a pending user message (typed or from an example button), streaming the reply
+    if st.session_state.messages[-1]["role"] == "user":
+        with chat_container:
+            placeholder = st.empty()
+            placeholder.markdown("_Thinking..._")
+            reply = ""
+            with tracing.tracer.trace("chat.turn") as trace:
+                for chunk in chatbot.run_conversation_stream(st.session_state.messages, st.session_state.context_window):
+                    reply += chunk
+                    placeholder.markdown(reply + "▌")
+            placeholder.empty()
+        st.session_state.last_trace = trace
+        st.session_state.messages.append({"role": "assistant", "content": reply})
+        st.rerun()
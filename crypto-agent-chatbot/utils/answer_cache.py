@@ -0,0 +1,64 @@
+import os
+
+from .api import ENDPOINT_TTLS
+from .cache import LRUCache
+
+MAX_ANSWERS = int(os.environ.get("CHAT_ANSWER_CACHE_MAX_ENTRIES", 1024))
+
+# Answers stay fresh as long as the data they were built from
+INTENT_TTLS = {
+    "price": ENDPOINT_TTLS["ticker"],
+    "top": ENDPOINT_TTLS["tickers"],
+    "global": ENDPOINT_TTLS["global"],
+    "details": min(ENDPOINT_TTLS["ticker"], ENDPOINT_TTLS["markets"]),
+}
+
+# Every chatbot failure message starts a line with this
+FAILURE_PREFIX = "Could not"
+
+def has_failure(answer):
+    """Whether any part of an answer failed; multi-coin answers have one line or block per coin."""
+    return any(line.startswith(FAILURE_PREFIX) for line in answer.splitlines())
+
+class AnswerCache:
+    """LRU cache of finished chat answers keyed by normalized intent."""
+
+    def __init__(self, max_entries=MAX_ANSWERS):
+        self.entries = LRUCache(max_entries)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key_for(intent):
+        """Returns the cache key for an intent, or None if it must not be cached."""
+        if intent.kind not in INTENT_TTLS:
+            return None
+        return (intent.kind, intent.coins, intent.n)
+
+    def get_or_answer(self, intent, answer):
+        """Returns a cached answer for intent, calling answer(intent) on a miss."""
+        key = self.key_for(intent)
+        if key is None:
+            return answer(intent)
+        cached = self.entries.get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        self.misses += 1
+        result = answer(intent)
+        # Don't keep an answer with a failed coin; let the next question retry it
+        if result is not None and not has_failure(result):
+            self.entries.set(key, result, INTENT_TTLS[intent.kind])
+        return result
+
+    def stats(self):
+        """Returns the entry count and hit rate."""
+        total = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+answer_cache = AnswerCache()
@@ -1,41 +1,200 @@
+import os
+import threading
+
 import requests
 import streamlit as st
+from . import session, tracing
+from .cache import response_cache
+from .scheduler import BACKGROUND, parse_retry_after, scheduler
+
+# Overridable so load tests can point at a local stand-in
+COINLORE_API_URL = os.environ.get("COINLORE_API_URL", "https://api.coinlore.net/api")
+
+# Seconds each endpoint's responses stay fresh in the response cache
+ENDPOINT_TTLS = {
+    "global": 30,
+    "tickers": 30,
+    "ticker": 30,
+    "markets": 3 * 3600,
+    "social_stats": 6 * 3600,
+}
+
+# CoinLore's /ticker/ accepts comma-separated ids
+TICKER_BATCH_SIZE = 50
 
-COINLORE_API_URL = "https://api.coinlore.net/api"
+# Extra attempts after a 429 before giving up on a request
+RATE_LIMIT_RETRIES = 2
 
-def handle_api_request(url):
-    """Handles API requests and returns JSON response."""
+_revalidating = set()
+_revalidating_lock = threading.Lock()
+
+@tracing.traced
+def handle_api_request(url, ttl=None):
+    """Handles API requests and returns JSON response, served from cache when fresh.
+
+    While upstream is rate limiting us, or when a request fails, the last
+    good cached response is served instead and refreshed in the background.
+    """
+    tracing.set_attribute("url", url)
+    if ttl is None:
+        return fetch_json(url)
+    if scheduler.is_throttled():
+        stale = response_cache.get(url, allow_stale=True)
+        if stale is not None:
+            scheduler.stale_served += 1
+            tracing.set_attribute("cache", "stale")
+            revalidate(url, ttl)
+            return stale
     try:
-        response = requests.get(url)
+        return response_cache.get_or_fetch(url, ttl, lambda: request_json(url))
+    except requests.exceptions.RequestException as e:
+        stale = response_cache.get(url, allow_stale=True)
+        if stale is not None:
+            scheduler.stale_served += 1
+            tracing.set_attribute("cache", "stale")
+            return stale
+        st.error(f"API request failed: {e}")
+        return None
+
+@tracing.traced
+def revalidate(url, ttl):
+    """Refreshes a stale cache entry on a background-lane thread, once per URL."""
+    with _revalidating_lock:
+        if url in _revalidating:
+            return
+        _revalidating.add(url)
+
+    def refresh():
+        try:
+            with scheduler.lane(BACKGROUND):
+                value = request_json(url)
+            if value is not None:
+                response_cache.set(url, value, ttl)
+        except requests.exceptions.RequestException:
+            pass
+        finally:
+            with _revalidating_lock:
+                _revalidating.discard(url)
+
+    threading.Thread(target=refresh, name="coinlore-revalidate", daemon=True).start()
+
+@tracing.traced
+def request_json(url, **json_kwargs):
+    """Sends one scheduled request, honouring Retry-After on 429 responses.
+
+    ``json_kwargs`` go to json.loads, e.g. an object_hook that turns rows
+    into records while the body is decoded.
+    """
+    for attempt in range(RATE_LIMIT_RETRIES + 1):
+        scheduler.acquire()
+        response = session.get(url)
+        tracing.set_attribute("http.url", url)
+        tracing.set_attribute("http.status_code", response.status_code)
+        if response.status_code == 429:
+            scheduler.throttle(parse_retry_after(response.headers.get("Retry-After")))
+            if attempt < RATE_LIMIT_RETRIES:
+                continue
         response.raise_for_status()
-        return response.json()
+        return response.json(**json_kwargs)
+
+@tracing.traced
+def fetch_json(url, **json_kwargs):
+    """Performs the upstream request, bypassing the cache."""
+    try:
+        return request_json(url, **json_kwargs)
     except requests.exceptions.RequestException as e:
         st.error(f"API request failed: {e}")
         return None
 
+@tracing.traced
 def get_global_stats():
     """Fetches global cryptocurrency market statistics."""
     url = f"{COINLORE_API_URL}/global/"
-    return handle_api_request(url)
+    return handle_api_request(url, ENDPOINT_TTLS["global"])
 
-def get_top_coins(limit=100):
+@tracing.traced
+def get_top_coins(limit=100, start=0):
     """Fetches a list of top cryptocurrencies."""
-    url = f"{COINLORE_API_URL}/tickers/?start=0&limit={limit}"
-    data = handle_api_request(url)
+    url = f"{COINLORE_API_URL}/tickers/?start={start}&limit={limit}"
+    data = handle_api_request(url, ENDPOINT_TTLS["tickers"])
+    return data if data else {'data': [], 'info': {}}
+
+@tracing.traced
+def get_ticker_page(start=0, limit=100, object_hook=None):
+    """Fetches one /tickers/ page uncached, for walks over the whole coin universe."""
+    url = f"{COINLORE_API_URL}/tickers/?start={start}&limit={limit}"
+    data = fetch_json(url, object_hook=object_hook)
     return data if data else {'data': [], 'info': {}}
 
+@tracing.traced
 def get_coin_details(coin_id):
     """Fetches detailed information for a specific coin."""
     url = f"{COINLORE_API_URL}/ticker/?id={coin_id}"
-    data = handle_api_request(url)
+    data = handle_api_request(url, ENDPOINT_TTLS["ticker"])
     return data[0] if data else None
 
+@tracing.traced
+def ticker_batches(coin_ids, snapshot=None):
+    """Splits ids into rows already in the snapshot and de-duplicated request batches."""
+    found, missing = {}, []
+    for coin_id in dict.fromkeys(str(c) for c in coin_ids):
+        row = snapshot.get_coin(coin_id) if snapshot is not None else None
+        if row is not None:
+            found[coin_id] = row
+        else:
+            missing.append(coin_id)
+    batches = [missing[i:i + TICKER_BATCH_SIZE] for i in range(0, len(missing), TICKER_BATCH_SIZE)]
+    return found, batches
+
+def ticker_batch_url(batch):
+    """Builds the /ticker/ URL for a batch; ids are sorted so equal sets share a cache entry."""
+    return f"{COINLORE_API_URL}/ticker/?id={','.join(sorted(batch, key=int))}"
+
+@tracing.traced
+def store_ticker_rows(rows, results):
+    """Collects batch rows by id and seeds the single-coin cache entries with them."""
+    for row in rows or []:
+        coin_id = str(row['id'])
+        results[coin_id] = row
+        response_cache.set(f"{COINLORE_API_URL}/ticker/?id={coin_id}", [row], ENDPOINT_TTLS["ticker"])
+
+@tracing.traced
+def get_coin_details_many(coin_ids, snapshot=None):
+    """Fetches details for several coins in as few /ticker/ requests as possible.
+
+    Coins present in ``snapshot`` are served from it; the rest are packed
+    into comma-separated batches. Returns a dict keyed by coin id.
+    """
+    results, batches = ticker_batches(coin_ids, snapshot)
+    for batch in batches:
+        store_ticker_rows(handle_api_request(ticker_batch_url(batch), ENDPOINT_TTLS["ticker"]), results)
+    return results
+
+@tracing.traced
 def get_coin_markets(coin_id):
     """Fetches market data for a specific coin."""
     url = f"{COINLORE_API_URL}/coin/markets/?id={coin_id}"
-    return handle_api_request(url)
+    return handle_api_request(url, ENDPOINT_TTLS["markets"])
+
+@tracing.traced
+def fetch_coin_markets(coin_id):
+    """Fetches a coin's market list uncached; markets.MarketsService keeps only its summary."""
+    return fetch_json(f"{COINLORE_API_URL}/coin/markets/?id={coin_id}")
 
+@tracing.traced
 def get_coin_social_stats(coin_id):
     """Fetches social media statistics for a specific coin."""
     url = f"{COINLORE_API_URL}/coin/social_stats/?id={coin_id}"
-    return handle_api_request(url) 
\ No newline at end of file
+    return handle_api_request(url, ENDPOINT_TTLS["social_stats"])
+
+def get_cache_stats():
+    """Returns hit/miss counters for the response cache."""
+    return response_cache.stats()
+
+def get_scheduler_stats():
+    """Returns queue depth, wait times and throttling counters for CoinLore calls."""
+    return scheduler.stats()
+
+def get_connection_stats():
+    """Returns connection-reuse counters for the pooled CoinLore session."""
+    return session.connection_stats()
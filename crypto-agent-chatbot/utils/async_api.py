@@ -0,0 +1,189 @@
+import asyncio
+import os
+import ssl
+import threading
+
+import httpx
+import streamlit as st
+
+from .api import COINLORE_API_URL, ENDPOINT_TTLS, store_ticker_rows, ticker_batch_url, ticker_batches
+from . import tracing
+from .cache import response_cache
+from .markets import market_service
+from .scheduler import parse_retry_after, scheduler
+
+MAX_CONCURRENCY = int(os.environ.get("COINLORE_MAX_CONCURRENCY", 8))
+TIMEOUT = httpx.Timeout(10.0, connect=3.05)
+
+_ssl_context = None
+_ssl_lock = threading.Lock()
+
+def get_ssl_context():
+    """Returns one shared SSL context; building it per client costs ~50ms of CA loading."""
+    global _ssl_context
+    if _ssl_context is None:
+        with _ssl_lock:
+            if _ssl_context is None:
+                _ssl_context = ssl.create_default_context()
+    return _ssl_context
+
+# One event loop and client for the whole process, so every async answer
+# reuses the same keep-alive connections instead of handshaking again
+_loop = None
+_shared_client = None
+_loop_lock = threading.Lock()
+
+def get_shared_client():
+    """Returns the process-wide client, opened on a background event loop on first use."""
+    global _loop, _shared_client
+    if _shared_client is None:
+        with _loop_lock:
+            if _shared_client is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="coinlore-async", daemon=True).start()
+                client = AsyncCoinLoreClient()
+                asyncio.run_coroutine_threadsafe(client.__aenter__(), loop).result()
+                _loop, _shared_client = loop, client
+    return _shared_client
+
+def run(coro):
+    """Runs a coroutine on the shared event loop and waits for its result.
+
+    The coroutine sees the caller's context, so tracing spans and the
+    scheduler lane carry over. Never call this from the loop itself.
+    """
+    get_shared_client()
+    return asyncio.run_coroutine_threadsafe(coro, _loop).result()
+
+class AsyncCoinLoreClient:
+    """Async CoinLore client that caps how many requests are in flight at once.
+
+    The app shares one instance through get_shared_client() and run(). A
+    standalone client is an async context manager, so its connection pool
+    is opened and closed on the running event loop:
+
+        async with AsyncCoinLoreClient() as client:
+            details, markets = await asyncio.gather(
+                client.get_coin_details(90), client.get_coin_markets(90)
+            )
+    """
+
+    def __init__(self, max_concurrency=MAX_CONCURRENCY, timeout=TIMEOUT):
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._client = None
+        self._semaphore = None
+
+    async def __aenter__(self):
+        limits = httpx.Limits(max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency)
+        self._client = httpx.AsyncClient(
+            timeout=self.timeout, limits=limits, verify=get_ssl_context(), headers={"Accept": "application/json"}
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self._client.aclose()
+        self._client = None
+
+    @tracing.traced
+    async def handle_api_request(self, url, ttl=None):
+        """Handles API requests and returns JSON response, sharing the sync response cache.
+
+        Cache misses go through the cache's single-flight guard, so concurrent
+        sessions asking for the same URL, sync or async, share one request.
+        """
+        tracing.set_attribute("url", url)
+        try:
+            if ttl is None:
+                return await self.request_json(url)
+            cached = response_cache.get(url)
+            if cached is not None:
+                response_cache.hits += 1
+                return cached
+            loop = asyncio.get_running_loop()
+
+            def fetch():
+                # Runs on a worker thread; the request itself still runs on this loop
+                return asyncio.run_coroutine_threadsafe(self.request_json(url), loop).result()
+
+            return await asyncio.to_thread(response_cache.get_or_fetch, url, ttl, fetch)
+        except httpx.HTTPError as e:
+            stale = response_cache.get(url, allow_stale=True) if ttl is not None else None
+            if stale is not None:
+                scheduler.stale_served += 1
+                tracing.set_attribute("cache", "stale")
+                return stale
+            st.error(f"API request failed: {e}")
+            return None
+
+    @tracing.traced
+    async def request_json(self, url):
+        """Sends one scheduled request through the shared token bucket."""
+        async with self._semaphore:
+            # Never wait for a token on a worker thread: cache misses already
+            # hold pool workers while they wait for this coroutine
+            await scheduler.acquire_async()
+            response = await self._client.get(url)
+            tracing.set_attribute("http.url", url)
+            tracing.set_attribute("http.status_code", response.status_code)
+            if response.status_code == 429:
+                scheduler.throttle(parse_retry_after(response.headers.get("Retry-After")))
+            response.raise_for_status()
+            return response.json()
+
+    @tracing.traced
+    async def get_global_stats(self):
+        """Fetches global cryptocurrency market statistics."""
+        return await self.handle_api_request(f"{COINLORE_API_URL}/global/", ENDPOINT_TTLS["global"])
+
+    @tracing.traced
+    async def get_top_coins(self, limit=100, start=0):
+        """Fetches a list of top cryptocurrencies."""
+        data = await self.handle_api_request(f"{COINLORE_API_URL}/tickers/?start={start}&limit={limit}", ENDPOINT_TTLS["tickers"])
+        return data if data else {'data': [], 'info': {}}
+
+    @tracing.traced
+    async def get_coin_details(self, coin_id):
+        """Fetches detailed information for a specific coin."""
+        data = await self.handle_api_request(f"{COINLORE_API_URL}/ticker/?id={coin_id}", ENDPOINT_TTLS["ticker"])
+        return data[0] if data else None
+
+    @tracing.traced
+    async def get_coin_details_many(self, coin_ids, snapshot=None):
+        """Batched details for several coins; batches are fetched concurrently."""
+        results, batches = ticker_batches(coin_ids, snapshot)
+        responses = await asyncio.gather(
+            *(self.handle_api_request(ticker_batch_url(batch), ENDPOINT_TTLS["ticker"]) for batch in batches)
+        )
+        for rows in responses:
+            store_ticker_rows(rows, results)
+        return results
+
+    @tracing.traced
+    async def get_coin_markets(self, coin_id):
+        """Fetches market data for a specific coin."""
+        return await self.handle_api_request(f"{COINLORE_API_URL}/coin/markets/?id={coin_id}", ENDPOINT_TTLS["markets"])
+
+    @tracing.traced
+    async def get_market_summary(self, coin_id):
+        """Returns the coin's cached MarketSummary, fetching its markets on this client on a miss."""
+        summary = market_service.get_fresh(coin_id)
+        if summary is not None:
+            return summary
+        loop = asyncio.get_running_loop()
+
+        def fetch(coin_id):
+            # Runs on a worker thread; the request itself still runs on this loop
+            return asyncio.run_coroutine_threadsafe(self.fetch_coin_markets(coin_id), loop).result()
+
+        return await asyncio.to_thread(market_service.get_summary, coin_id, fetch)
+
+    async def fetch_coin_markets(self, coin_id):
+        """Fetches a coin's raw market list, bypassing the response cache."""
+        return await self.handle_api_request(f"{COINLORE_API_URL}/coin/markets/?id={coin_id}")
+
+    @tracing.traced
+    async def get_coin_social_stats(self, coin_id):
+        """Fetches social media statistics for a specific coin."""
+        return await self.handle_api_request(f"{COINLORE_API_URL}/coin/social_stats/?id={coin_id}", ENDPOINT_TTLS["social_stats"])
@@ -0,0 +1,178 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+MAX_ENTRIES = int(os.environ.get("COINLORE_CACHE_MAX_ENTRIES", 512))
+# Set to a file path to keep responses across restarts
+DISK_CACHE_PATH = os.environ.get("COINLORE_CACHE_DB")
+
+class LRUCache:
+    """Size-bounded in-process cache whose entries carry their own expiry."""
+
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, allow_stale=False):
+        """Returns a cached value, or None when missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.time() and not allow_stale:
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        """Stores a value for ttl seconds, evicting the least recently used entry."""
+        with self._lock:
+            self._entries[key] = (value, time.time() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drops every entry."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+class SQLiteCache:
+    """On-disk JSON cache tier that survives process restarts."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+
+    def _connect(self):
+        # sqlite3 connections may not cross threads, so keep one per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key, allow_stale=False):
+        """Returns a (value, expires_at) pair, or None when missing or expired."""
+        row = self._connect().execute(
+            "SELECT value, expires_at FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or (row[1] < time.time() and not allow_stale):
+            return None
+        return json.loads(row[0]), row[1]
+
+    def set(self, key, value, ttl):
+        """Stores a JSON-serialisable value for ttl seconds."""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), time.time() + ttl),
+            )
+
+class ResponseCache:
+    """Memory-then-disk response cache with single-flight deduplication.
+
+    Concurrent misses for the same key wait on the first caller's fetch
+    instead of each sending their own upstream request.
+    """
+
+    def __init__(self, memory=None, disk=None):
+        self.memory = memory if memory is not None else LRUCache()
+        self.disk = disk
+        self.hits = 0
+        self.misses = 0
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+
+    def get(self, key, allow_stale=False):
+        """Looks a key up in memory, then on disk, promoting disk hits."""
+        value = self.memory.get(key, allow_stale=allow_stale)
+        if value is not None:
+            return value
+        if self.disk is not None:
+            row = self.disk.get(key, allow_stale=allow_stale)
+            if row is not None:
+                value, expires_at = row
+                self.memory.set(key, value, max(expires_at - time.time(), 0))
+                return value
+        return None
+
+    def set(self, key, value, ttl):
+        """Writes a value through to every tier."""
+        self.memory.set(key, value, ttl)
+        if self.disk is not None:
+            self.disk.set(key, value, ttl)
+
+    def lookup(self, key):
+        """Like get(), but counts the result towards the hit rate."""
+        value = self.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def get_or_fetch(self, key, ttl, fetch):
+        """Returns the cached value for key, calling fetch() at most once per miss."""
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        with self._inflight_lock:
+            event = self._inflight.get(key)
+            leader = event is None
+            if leader:
+                event = self._inflight[key] = threading.Event()
+
+        if not leader:
+            event.wait()
+            value = self.get(key)
+            if value is not None:
+                self.hits += 1
+                return value
+            # The leader's fetch failed; fall back to our own attempt
+            self.misses += 1
+            return fetch()
+
+        self.misses += 1
+        try:
+            value = fetch()
+            if value is not None:
+                self.set(key, value, ttl)
+            return value
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+            event.set()
+
+    def stats(self):
+        """Returns hit/miss counters and the in-memory entry count."""
+        total = self.hits + self.misses
+        return {
+            "entries": len(self.memory),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "disk": self.disk.path if self.disk is not None else None,
+        }
+
+    def clear(self):
+        """Drops the in-memory tier; disk entries expire on their own."""
+        self.memory.clear()
+
+response_cache = ResponseCache(disk=SQLiteCache(DISK_CACHE_PATH) if DISK_CACHE_PATH else None)
@@ -67,4 +67,65 @@ def create_market_cap_pie_chart(df):
             x=0.5
         )
     )
-    return fig 
\ No newline at end of file
+    return fig
+
+def create_price_history_chart(series, labels):
+    """Creates a line chart of price history for several coins.
+
+    ``series`` maps coin id to (unix timestamps, prices); ``labels`` maps
+    coin id to the name shown in the legend.
+    """
+    palette = [COLORS['primary'], COLORS['highlight'], COLORS['gold'], COLORS['secondary']]
+    fig = go.Figure()
+    for i, (coin_id, (xs, ys)) in enumerate(series.items()):
+        fig.add_trace(go.Scattergl(
+            x=pd.to_datetime(xs, unit='s'),
+            y=ys,
+            mode='lines',
+            name=labels.get(coin_id, coin_id),
+            line=dict(color=palette[i % len(palette)], width=1.5)
+        ))
+
+    fig.update_layout(
+        title="Price History",
+        xaxis_title="Date",
+        yaxis_title="Price (USD)",
+        plot_bgcolor=COLORS['background'],
+        paper_bgcolor=COLORS['background'],
+        font_color=COLORS['text'],
+        xaxis=dict(showgrid=False),
+        yaxis=dict(gridcolor='rgba(255, 255, 255, 0.1)', type='log'),
+        hovermode='x unified'
+    )
+    return fig
+
+def create_trace_waterfall(rows):
+    """Creates a waterfall of one request's spans from Trace.waterfall() rows."""
+    labels = [f"{'  ' * row['depth']}{row['name']}" for row in rows]
+    fig = go.Figure(go.Bar(
+        x=[max(row['duration_ms'], 0.01) for row in rows],
+        base=[row['start_ms'] for row in rows],
+        y=list(range(len(rows))),
+        orientation='h',
+        marker_color=[COLORS['secondary'] if row['status'] == 'error' else COLORS['primary'] for row in rows],
+        text=[f"{row['duration_ms']:.1f} ms" for row in rows],
+        textposition='outside',
+        hovertext=[
+            "<br>".join([row['name'], *(f"{k}: {v}" for k, v in row['attributes'].items())])
+            for row in rows
+        ],
+        hoverinfo='text'
+    ))
+
+    fig.update_layout(
+        xaxis_title="ms since request start",
+        plot_bgcolor=COLORS['background'],
+        paper_bgcolor=COLORS['background'],
+        font_color=COLORS['text'],
+        height=max(200, 22 * len(rows) + 80),
+        margin=dict(l=0, r=0, t=10, b=0),
+        xaxis=dict(gridcolor='rgba(255, 255, 255, 0.1)'),
+        yaxis=dict(tickvals=list(range(len(rows))), ticktext=labels, autorange='reversed'),
+        showlegend=False
+    )
+    return fig
@@ -1,52 +1,86 @@
 import streamlit as st
-from openai import OpenAI
 import json
-from . import api
-
-# Initialize OpenAI client for OpenRouter
-client = OpenAI(
-    base_url="https://openrouter.ai/api/v1",
-    api_key=st.secrets["OPENROUTER_API_KEY"],
-    default_headers={
-        "HTTP-Referer": "https://github.com/AyeshaMughal20/crypto-agent-chatbot",
-        "X-Title": "Crypto AI Dashboard"
-    }
-)
+import os
+import asyncio
+import threading
+import time
+from collections import deque
+from . import api, coin_index, poller, router, tracing
+from .answer_cache import answer_cache
+from .context import ContextWindow
+from .markets import market_service
 
+# The OpenRouter client is created on the first model call: importing
+# openai and building the client takes about half a second, which
+# sessions that only ask data questions never need to pay.
+_client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    """Returns the OpenAI client for OpenRouter, creating it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from openai import OpenAI
+                _client = OpenAI(
+                    base_url=os.environ.get("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1"),
+                    api_key=os.environ.get("OPENROUTER_API_KEY") or st.secrets["OPENROUTER_API_KEY"],
+                    default_headers={
+                        "HTTP-Referer": "https://github.com/AyeshaMughal20/crypto-agent-chatbot",
+                        "X-Title": "Crypto AI Dashboard"
+                    }
+                )
+    return _client
+
+EXAMPLE_QUESTIONS = [
+    "What's the current Bitcoin price?",
+    "Show me the top 10 cryptocurrencies",
+    "What are the global market statistics?",
+    "Tell me about Ethereum"
+]
+
+@tracing.traced
 def get_coin_id(coin_name):
     """Helper to find a coin's ID by its name or symbol."""
-    coins_response = api.get_top_coins(limit=1000) 
-    if coins_response and 'data' in coins_response:
-        for coin in coins_response['data']:
-            if coin['name'].lower() == coin_name.lower() or coin['symbol'].lower() == coin_name.lower():
-                return coin['id']
-    return None
+    return coin_index.lookup(coin_name)
 
+@tracing.traced
 def get_crypto_price(coin_name):
     """Get current price for a cryptocurrency."""
     coin_id = get_coin_id(coin_name)
     if not coin_id:
         return f"Could not find cryptocurrency '{coin_name}'"
-    details = api.get_coin_details(coin_id)
+    details = poller.get_snapshot().get_coin(coin_id) or api.get_coin_details(coin_id)
+    return format_price(coin_name, details)
+
+def format_price(coin_name, details):
+    """Formats a price answer from a ticker row."""
     if details and 'price_usd' in details:
         return f"The current price of {coin_name} is ${float(details['price_usd']):,.2f}"
     return f"Could not fetch price for {coin_name}"
 
+@tracing.traced
 def get_top_cryptocurrencies(limit=10):
     """Get list of top cryptocurrencies."""
-    response = api.get_top_coins(limit)
-    if not response or 'data' not in response:
-        return "Could not fetch cryptocurrency data"
+    snapshot = poller.get_snapshot()
+    if len(snapshot.coins) >= limit:
+        coins = snapshot.coins[:limit]
+    else:
+        response = api.get_top_coins(limit)
+        if not response or 'data' not in response:
+            return "Could not fetch cryptocurrency data"
+        coins = response['data'][:limit]
     
-    coins = response['data'][:limit]
     result = "Here are the top {} cryptocurrencies by market cap:\n\n".format(limit)
     for coin in coins:
         result += f"• {coin['name']} ({coin['symbol']}): ${float(coin['price_usd']):,.2f}\n"
     return result
 
+@tracing.traced
 def get_global_stats():
     """Get global market statistics."""
-    stats = api.get_global_stats()
+    stats = poller.get_snapshot().global_stats or api.get_global_stats()
     if not stats:
         return "Could not fetch global market statistics"
     
@@ -59,18 +93,28 @@ def get_global_stats():
 • Active Markets: {stats['active_markets']:,}
 • Total Coins: {stats['coins_count']:,}"""
 
+@tracing.traced
 def get_coin_details(coin_name):
     """Get detailed information about a cryptocurrency."""
     coin_id = get_coin_id(coin_name)
     if not coin_id:
         return f"Could not find cryptocurrency '{coin_name}'"
     
-    details = api.get_coin_details(coin_id)
+    details = poller.get_snapshot().get_coin(coin_id) or api.get_coin_details(coin_id)
     if not details:
         return f"Could not fetch details for {coin_name}"
     
-    markets = api.get_coin_markets(coin_id)
-    exchanges = len(markets) if markets else 0
+    summary = market_service.get_summary(coin_id)
+    return format_coin_details(coin_name, details, summary)
+
+def format_coin_details(coin_name, details, summary):
+    """Formats a coin summary from its ticker row and MarketSummary."""
+    if not details:
+        return f"Could not fetch details for {coin_name}"
+    exchanges = summary.exchange_count if summary else 0
+    top = ""
+    if summary and summary.top_exchanges:
+        top = "\n• Top Exchanges: " + ", ".join(f"{e.name} ({e.share:.0%})" for e in summary.top_exchanges[:3])
     
     return f"""Here's what I found about {details['name']} ({details['symbol']}):
 
@@ -79,55 +123,180 @@ def get_coin_details(coin_name):
 • Market Cap: ${float(details['market_cap_usd']):,.2f}
 • 24h Volume: ${float(details['volume24']):,.2f}
 • 24h Change: {details['percent_change_24h']}%
-• Available on {exchanges} exchanges
+• Available on {exchanges} exchanges{top}
 • Circulating Supply: {float(details['csupply']):,.0f} {details['symbol']}"""
 
-def run_conversation(messages):
-    """Runs the conversation with the model."""
-    try:
-        # Get the user's last message
-        user_message = messages[-1]['content'].lower()
-        
-        # Prepare system context
-        if len(messages) == 1:  # If this is the first user message
-            messages.insert(0, {
-                "role": "system",
-                "content": """You are a cryptocurrency expert assistant. You help users get information about cryptocurrencies, 
+@tracing.traced
+def resolve_coin_ids(coin_names):
+    """Maps each coin name to its id (None when unknown), keeping the caller's order."""
+    return {name: get_coin_id(name) for name in coin_names}
+
+@tracing.traced
+async def get_many_coin_details_async(coin_names, client):
+    """Resolves several coins at once so the whole answer costs one round-trip.
+
+    Tickers for every coin come from one batched /ticker/ request (or the
+    snapshot) while the per-coin market summaries are fetched alongside it.
+    """
+    ids = resolve_coin_ids(coin_names)
+    known = [coin_id for coin_id in ids.values() if coin_id]
+    details, *summaries = await asyncio.gather(
+        client.get_coin_details_many(known, poller.get_snapshot()),
+        *(client.get_market_summary(coin_id) for coin_id in known)
+    )
+    summaries_by_id = dict(zip(known, summaries))
+    answers = []
+    for name, coin_id in ids.items():
+        if not coin_id:
+            answers.append(f"Could not find cryptocurrency '{name}'")
+        else:
+            answers.append(format_coin_details(name, details.get(str(coin_id)), summaries_by_id[coin_id]))
+    return "\n\n".join(answers)
+
+def format_prices(ids, details):
+    """Formats one price line per requested coin."""
+    lines = []
+    for name, coin_id in ids.items():
+        if not coin_id:
+            lines.append(f"Could not find cryptocurrency '{name}'")
+        else:
+            lines.append(format_price(name, details.get(str(coin_id))))
+    return "\n".join(lines)
+
+@tracing.traced
+def get_many_coin_details(coin_names):
+    """Sync entry point for detail answers, run on the shared async client."""
+    from . import async_api  # httpx is only needed for detail answers
+    return async_api.run(get_many_coin_details_async(coin_names, async_api.get_shared_client()))
+
+@tracing.traced
+def get_many_crypto_prices(coin_names):
+    """Prices for several coins from the snapshot or one batched ticker request."""
+    ids = resolve_coin_ids(coin_names)
+    details = api.get_coin_details_many([i for i in ids.values() if i], poller.get_snapshot())
+    return format_prices(ids, details)
+
+@tracing.traced
+def answer_intent(intent):
+    """Answers a routed data intent, or returns None when the model should reply."""
+    coins = [coin.upper() for coin in intent.coins]
+    tracing.set_attribute("intent", intent.kind)
+    tracing.set_attribute("coins", ",".join(coins))
+    if intent.kind == "price":
+        return get_crypto_price(coins[0]) if len(coins) == 1 else get_many_crypto_prices(coins)
+    if intent.kind == "top":
+        return get_top_cryptocurrencies(intent.n)
+    if intent.kind == "global":
+        return get_global_stats()
+    if intent.kind == "details":
+        # Even a single coin benefits: ticker and market summary are fetched together
+        return get_many_coin_details(coins)
+    return None
+
+SYSTEM_PROMPT = """You are a cryptocurrency expert assistant. You help users get information about cryptocurrencies, 
                 prices, market statistics, and more. Keep your responses concise and focused on the data."""
-            })
-        
-        # Check for common patterns and get data directly
-        if "price" in user_message and ("bitcoin" in user_message or "btc" in user_message):
-            return {"role": "assistant", "content": get_crypto_price("BTC")}
-        
-        elif "price" in user_message:
-            # Extract coin name after "price of" or similar patterns
-            for coin in ["eth", "ethereum", "bnb", "binance", "xrp", "doge", "dogecoin"]:
-                if coin in user_message:
-                    return {"role": "assistant", "content": get_crypto_price(coin)}
-        
-        elif "top" in user_message and any(str(i) for i in range(1, 101) if str(i) in user_message):
-            # Extract number after "top"
-            for i in range(1, 101):
-                if str(i) in user_message:
-                    return {"role": "assistant", "content": get_top_cryptocurrencies(i)}
-            return {"role": "assistant", "content": get_top_cryptocurrencies(10)}
-        
-        elif "global" in user_message or "market" in user_message or "stats" in user_message:
-            return {"role": "assistant", "content": get_global_stats()}
+
+MODEL = "anthropic/claude-2"
+ERROR_REPLY = "I apologize, but I encountered an error. Please try asking your question in a different way."
+
+# First-token and total latency of recent model calls, newest last
+llm_latencies = deque(maxlen=200)
+
+def record_llm_latency(started, first_token_at, finished, stream, chunks, context_report=None):
+    """Stores the latency breakdown and prompt size of one model call."""
+    llm_latencies.append({
+        "model": MODEL,
+        "stream": stream,
+        "first_token_s": (first_token_at - started) if first_token_at else None,
+        "total_s": finished - started,
+        "chunks": chunks,
+        "at": time.time(),
+        **(context_report or {}),
+    })
+
+def get_llm_latencies():
+    """Returns the recorded model latencies as a list of dicts."""
+    return list(llm_latencies)
+
+@tracing.traced
+def stream_model_reply(messages, context=None):
+    """Yields the model's reply token by token as OpenRouter streams it."""
+    context = context or ContextWindow()
+    with tracing.span("chatbot.context_window"):
+        prompt = context.build(messages, SYSTEM_PROMPT)
+    started = time.perf_counter()
+    first_token_at, chunks = None, 0
+    tracing.set_attribute("model", MODEL)
+    tracing.set_attribute("prompt_messages", len(prompt))
+    stream = get_client().chat.completions.create(
+        model=MODEL,
+        messages=prompt,
+        temperature=0.7,
+        max_tokens=500,
+        stream=True
+    )
+    try:
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                if first_token_at is None:
+                    first_token_at = time.perf_counter()
+                chunks += 1
+                yield delta
+    finally:
+        # Release the connection even when the caller stops reading mid-reply
+        stream.close()
+        record_llm_latency(started, first_token_at, time.perf_counter(), True, chunks, context.last_report)
+        tracing.set_attribute("chunks", chunks)
+        if first_token_at is not None:
+            tracing.set_attribute("first_token_ms", (first_token_at - started) * 1000)
+
+def answer_data_question(user_message):
+    """Routes a message and answers it from the data tools, or returns None for the model."""
+    with tracing.span("chatbot.route"):
+        intent = router.route(user_message)
+        tracing.set_attribute("intent", intent.kind)
+    # A cache miss shows up as a nested answer_intent span
+    with tracing.span("chatbot.answer_cache", intent=intent.kind):
+        return answer_cache.get_or_answer(intent, answer_intent)
+
+def get_answer_cache_stats():
+    """Returns hit-rate counters for the chat answer cache."""
+    return answer_cache.stats()
+
+@tracing.traced
+def run_conversation(messages, context=None):
+    """Runs the conversation with the model.
+
+    Pass the session's ContextWindow as ``context`` so older turns are
+    summarized incrementally instead of being resent in full.
+    """
+    try:
+        # As typed: the router reads capitalised words as tickers. The system
+        # prompt is added by ContextWindow.build, never to the session history
+        user_message = messages[-1]['content']
         
-        elif any(coin in user_message for coin in ["bitcoin", "btc", "ethereum", "eth", "bnb", "xrp", "doge"]):
-            for coin in ["btc", "eth", "bnb", "xrp", "doge"]:
-                if coin in user_message:
-                    return {"role": "assistant", "content": get_coin_details(coin)}
+        # Classify the message once and answer data questions directly
+        answer = answer_data_question(user_message)
+        if answer is not None:
+            return {"role": "assistant", "content": answer}
         
         # If no pattern matched, get a general response from the model
-        response = client.chat.completions.create(
-            model="anthropic/claude-2",
-            messages=messages,
-            temperature=0.7,
-            max_tokens=500
-        )
+        context = context or ContextWindow()
+        with tracing.span("chatbot.context_window"):
+            prompt = context.build(messages, SYSTEM_PROMPT)
+        started = time.perf_counter()
+        with tracing.span("chatbot.llm", model=MODEL, prompt_messages=len(prompt)):
+            response = get_client().chat.completions.create(
+                model=MODEL,
+                messages=prompt,
+                temperature=0.7,
+                max_tokens=500
+            )
+        finished = time.perf_counter()
+        record_llm_latency(started, finished, finished, False, 1, context.last_report)
         
         return {
             "role": "assistant",
@@ -138,5 +307,23 @@ def run_conversation(messages):
         st.error(f"An error occurred: {e}")
         return {
             "role": "assistant",
-            "content": "I apologize, but I encountered an error. Please try asking your question in a different way."
-        } 
\ No newline at end of file
+            "content": ERROR_REPLY
+        }
+
+@tracing.traced
+def run_conversation_stream(messages, context=None):
+    """Streaming variant of run_conversation that yields the reply in chunks.
+
+    Data answers arrive as a single chunk; model replies arrive token by
+    token so the UI can render them as they are generated.
+    """
+    try:
+        user_message = messages[-1]['content']
+        answer = answer_data_question(user_message)
+        if answer is not None:
+            yield answer
+            return
+        yield from stream_model_reply(messages, context)
+    except Exception as e:
+        st.error(f"An error occurred: {e}")
+        yield ERROR_REPLY
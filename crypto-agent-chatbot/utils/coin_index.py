@@ -0,0 +1,120 @@
+import os
+import threading
+import time
+
+from . import paginator
+from .scheduler import BACKGROUND, scheduler
+
+# Coins indexed by rank; 0 indexes the whole CoinLore universe
+INDEX_MAX_COINS = int(os.environ.get("COINLORE_INDEX_MAX_COINS", 1000))
+REFRESH_TTL = 600  # seconds between background rebuilds
+RETRY_INTERVAL = 30  # seconds between rebuild attempts while no build has succeeded
+
+class CoinIndex:
+    """Process-wide symbol/name to coin-id lookup, refreshed in the background."""
+
+    def __init__(self, max_coins=INDEX_MAX_COINS, ttl=REFRESH_TTL, retry_interval=RETRY_INTERVAL):
+        self.max_coins = max_coins
+        self.ttl = ttl
+        self.retry_interval = retry_interval
+        self.by_symbol = {}
+        self.by_name = {}
+        self.coins = {}
+        self.built_at = None
+        self.failed_at = None
+        self.failures = 0
+        self.hits = 0
+        self.misses = 0
+        self._build_lock = threading.Lock()
+        self._refresher = None
+        self._stop = threading.Event()
+
+    def build(self):
+        """Pulls the ticker pages and swaps in freshly built lookup tables."""
+        by_symbol, by_name, coins = {}, {}, {}
+        for ticker in paginator.iter_tickers(self.max_coins or None):
+            # Tickers arrive in rank order, so the best ranked coin keeps a shared symbol
+            by_symbol.setdefault(ticker.symbol.lower(), ticker.id)
+            by_name.setdefault(ticker.name.lower(), ticker.id)
+            coins[ticker.id] = ticker
+        if not coins:
+            return False
+        # Rebinding whole dicts keeps concurrent readers on a consistent view
+        self.by_symbol, self.by_name, self.coins = by_symbol, by_name, coins
+        self.built_at = time.time()
+        return True
+
+    def try_build(self):
+        """Runs build(), recording the time of a failed or empty build."""
+        try:
+            if self.build():
+                return True
+        except Exception:
+            pass
+        self.failed_at = time.time()
+        self.failures += 1
+        return False
+
+    def ensure_built(self):
+        """Builds the index once and starts the background refresher.
+
+        Only the first caller waits for a build. If it fails, lookups serve
+        the empty index instead of retrying a blocking walk on every chat
+        turn; the refresher retries every ``retry_interval`` until one succeeds.
+        """
+        if self._refresher is not None:
+            return
+        with self._build_lock:
+            if self._refresher is None:
+                self.try_build()
+                self._refresher = threading.Thread(target=self._refresh_loop, name="coin-index-refresh", daemon=True)
+                self._refresher.start()
+
+    def _refresh_loop(self):
+        """Rebuilds the index every TTL, or sooner while it has never been built, until stopped."""
+        while not self._stop.wait(self.ttl if self.built_at is not None else self.retry_interval):
+            # A failed build keeps serving the previous tables until the next cycle succeeds
+            with scheduler.lane(BACKGROUND):
+                self.try_build()
+
+    def stop(self):
+        """Stops the background refresher."""
+        self._stop.set()
+
+    def lookup(self, coin_name):
+        """Returns the coin id for a name or symbol without touching the network."""
+        key = coin_name.strip().lower()
+        coin_id = self.by_name.get(key) or self.by_symbol.get(key)
+        if coin_id is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return coin_id
+
+    def get_coin(self, coin_id):
+        """Returns the indexed Ticker record for a coin id, if any."""
+        return self.coins.get(coin_id)
+
+    def stats(self):
+        """Returns index size, age and hit/miss counters."""
+        total = self.hits + self.misses
+        return {
+            "symbols": len(self.by_symbol),
+            "names": len(self.by_name),
+            "age_seconds": time.time() - self.built_at if self.built_at else None,
+            "failures": self.failures,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+_index = CoinIndex()
+
+def get_index():
+    """Returns the shared coin index, building it on first use."""
+    _index.ensure_built()
+    return _index
+
+def lookup(coin_name):
+    """Resolves a coin name or symbol to its CoinLore id."""
+    return get_index().lookup(coin_name)
@@ -0,0 +1,101 @@
+import os
+import re
+from collections import deque
+
+RECENT_MESSAGES = int(os.environ.get("CHAT_CONTEXT_RECENT_MESSAGES", 8))
+TOKEN_BUDGET = int(os.environ.get("CHAT_CONTEXT_TOKEN_BUDGET", 2000))
+SUMMARY_TOKENS = int(os.environ.get("CHAT_CONTEXT_SUMMARY_TOKENS", 300))
+SUMMARY_LINE_CHARS = 160
+MESSAGE_OVERHEAD_TOKENS = 4  # role and separators per chat message
+
+_encoding = None  # tiktoken encoding, False when tiktoken is not installed
+
+def get_encoding():
+    """Loads the tokenizer on first use; tiktoken is optional and slow to import."""
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except ImportError:  # fall back to a character-based estimate
+            _encoding = False
+    return _encoding
+
+def estimate_tokens(text):
+    """Estimates the token count of a string with a local tokenizer."""
+    if not text:
+        return 0
+    encoding = get_encoding()
+    if encoding:
+        return len(encoding.encode(text))
+    # Roughly four characters per token for English prose
+    return max(1, len(text) // 4)
+
+def count_message_tokens(messages):
+    """Estimates the prompt tokens a list of chat messages will cost."""
+    return sum(estimate_tokens(m["content"]) + MESSAGE_OVERHEAD_TOKENS for m in messages)
+
+def summarize_message(message):
+    """Condenses one message into a single summary line."""
+    text = re.sub(r"\s+", " ", message["content"]).strip()
+    first_sentence = re.split(r"(?<=[.!?])\s", text, maxsplit=1)[0]
+    if len(first_sentence) > SUMMARY_LINE_CHARS:
+        first_sentence = first_sentence[:SUMMARY_LINE_CHARS - 3] + "..."
+    return f"{message['role']}: {first_sentence}"
+
+class ContextWindow:
+    """Keeps the prompt sent to the model within a fixed token budget.
+
+    The prompt is the system prompt, a rolling summary of older turns and
+    the most recent messages. Messages that age out of the recent window
+    are summarized once and appended to the summary, so each call only does
+    work proportional to what changed since the previous one.
+    """
+
+    def __init__(self, recent_messages=RECENT_MESSAGES, token_budget=TOKEN_BUDGET, summary_tokens=SUMMARY_TOKENS):
+        self.recent_messages = recent_messages
+        self.token_budget = token_budget
+        self.summary_tokens = summary_tokens
+        self.summary_lines = deque()
+        self.summarized_count = 0
+        self.last_report = None
+
+    def _roll_summary(self, older):
+        """Summarizes messages that newly left the recent window."""
+        if len(older) < self.summarized_count:
+            # The history was reset or rewritten; start the summary over
+            self.summary_lines.clear()
+            self.summarized_count = 0
+        for message in older[self.summarized_count:]:
+            self.summary_lines.append(summarize_message(message))
+        self.summarized_count = len(older)
+        while self.summary_lines and estimate_tokens("\n".join(self.summary_lines)) > self.summary_tokens:
+            self.summary_lines.popleft()
+
+    def build(self, messages, system_prompt):
+        """Returns the trimmed message list to send, recording a token report."""
+        conversation = [m for m in messages if m["role"] != "system"]
+        system = next((m for m in messages if m["role"] == "system"), {"role": "system", "content": system_prompt})
+        recent = conversation[-self.recent_messages:]
+        self._roll_summary(conversation[:-self.recent_messages] if len(conversation) > self.recent_messages else [])
+
+        prefix = [system]
+        if self.summary_lines:
+            prefix.append({
+                "role": "system",
+                "content": "Summary of the earlier conversation:\n" + "\n".join(self.summary_lines),
+            })
+        # Drop the oldest recent messages until the budget fits, but always keep the latest one
+        while len(recent) > 1 and count_message_tokens(prefix + recent) > self.token_budget:
+            recent = recent[1:]
+        trimmed = prefix + recent
+
+        self.last_report = {
+            "messages_before": len(messages),
+            "messages_after": len(trimmed),
+            "tokens_before": count_message_tokens(messages),
+            "tokens_after": count_message_tokens(trimmed),
+            "summarized_messages": self.summarized_count,
+        }
+        self.last_report["tokens_saved"] = self.last_report["tokens_before"] - self.last_report["tokens_after"]
+        return trimmed
@@ -15,4 +15,13 @@ def get_footer():
         Made with <span style="color: #B3001B;">&#10084;</span> by Ayesha Mughal
     </div>
     """
-    return footer 
\ No newline at end of file
+    return footer
+
+def format_age(seconds):
+    """Formats a data age in seconds as a short human-readable string."""
+    seconds = int(max(seconds, 0))
+    if seconds < 60:
+        return f"{seconds}s"
+    if seconds < 3600:
+        return f"{seconds // 60}m {seconds % 60}s"
+    return f"{seconds // 3600}h {seconds % 3600 // 60}m"
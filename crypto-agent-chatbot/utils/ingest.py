@@ -0,0 +1,98 @@
+import math
+from operator import itemgetter
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+# CoinLore sends every number as a string; these become float64 columns
+FLOAT_COLUMNS = (
+    'price_usd', 'percent_change_24h', 'percent_change_1h',
+    'percent_change_7d', 'market_cap_usd', 'volume24',
+)
+INT_COLUMNS = ('rank',)
+CATEGORY_COLUMNS = ('symbol', 'name')
+
+def _to_float64(values):
+    """Converts a list of numeric strings to float64 in a single C-level pass."""
+    array = np.array(values, dtype=object)
+    try:
+        return array.astype(np.float64)
+    except (TypeError, ValueError):
+        pass
+    # Blank cells are common (e.g. no max supply); map them to NaN and retry
+    array[(array == "") | (array == None)] = np.nan  # noqa: E711 - elementwise
+    try:
+        return array.astype(np.float64)
+    except (TypeError, ValueError):
+        return pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').to_numpy(np.float64)
+
+def parse_tickers(rows):
+    """Builds a typed coin DataFrame from raw /tickers/ rows.
+
+    Rows are transposed into per-column lists, then each column is converted
+    as a whole: float64 for prices, caps and changes, Int64 for rank and
+    categoricals for symbol and name. Other fields keep CoinLore's strings.
+    """
+    if not rows:
+        return pd.DataFrame()
+    columns = {}
+    for name in rows[0]:
+        try:
+            columns[name] = list(map(itemgetter(name), rows))
+        except KeyError:
+            columns[name] = [row.get(name) for row in rows]
+
+    data = {}
+    for name, values in columns.items():
+        if name in FLOAT_COLUMNS:
+            data[name] = _to_float64(values)
+        elif name in INT_COLUMNS:
+            data[name] = pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').astype('Int64')
+        elif name in CATEGORY_COLUMNS:
+            data[name] = pd.Categorical(values)
+        else:
+            data[name] = values
+    return pd.DataFrame(data)
+
+class Ticker(NamedTuple):
+    """One typed /tickers/ row; much smaller than the raw dict of strings."""
+    id: str
+    symbol: str
+    name: str
+    nameid: str
+    rank: int
+    price_usd: float
+    percent_change_24h: float
+    percent_change_1h: float
+    percent_change_7d: float
+    price_btc: float
+    market_cap_usd: float
+    volume24: float
+    volume24a: float
+    csupply: float
+    tsupply: float
+    msupply: float
+
+TICKER_FLOAT_FIELDS = Ticker._fields[5:]
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+def ticker_from_row(row):
+    """Converts a raw /tickers/ row into a Ticker."""
+    return Ticker(
+        str(row['id']), row['symbol'], row['name'], row.get('nameid', ''),
+        int(row.get('rank') or 0), *(_number(row.get(name)) for name in TICKER_FLOAT_FIELDS),
+    )
+
+def ticker_hook(obj):
+    """json object_hook that turns each coin row into a Ticker as it is decoded.
+
+    Rows never pile up as dicts; the page's data list is built from
+    Tickers directly and the enclosing objects pass through unchanged.
+    """
+    return ticker_from_row(obj) if 'price_usd' in obj and 'symbol' in obj else obj
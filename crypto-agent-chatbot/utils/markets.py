@@ -0,0 +1,113 @@
+import os
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+
+from . import api, tracing
+from .cache import LRUCache, ResponseCache
+
+TOP_EXCHANGES = 5
+MAX_SUMMARIES = int(os.environ.get("COINLORE_MARKETS_MAX_ENTRIES", 2048))
+
+@dataclass(frozen=True)
+class ExchangeVolume:
+    """One exchange's 24h volume for a coin, summed over its pairs."""
+    name: str
+    volume_usd: float
+    share: float
+
+@dataclass(frozen=True)
+class MarketSummary:
+    """What the chatbot needs to know about a coin's markets, without the pair list."""
+    coin_id: str
+    exchange_count: int
+    pair_count: int
+    total_volume_usd: float
+    vwap_usd: float | None
+    top_exchanges: tuple
+    computed_at: float
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+def summarize_markets(coin_id, markets, top_n=TOP_EXCHANGES):
+    """Reduces a /coin/markets/ payload to a MarketSummary in one pass.
+
+    The volume-weighted price weights each pair's USD price by its traded
+    base-asset volume; pairs without a price or volume are skipped.
+    """
+    by_exchange = defaultdict(float)
+    weighted_price = traded = 0.0
+    for market in markets or ():
+        price = _number(market.get('price_usd'))
+        volume = _number(market.get('volume'))
+        volume_usd = _number(market.get('volume_usd'))
+        by_exchange[market.get('name') or "unknown"] += volume_usd
+        if price > 0 and volume > 0:
+            weighted_price += price * volume
+            traded += volume
+    total = sum(by_exchange.values())
+    top = sorted(by_exchange.items(), key=lambda item: item[1], reverse=True)[:top_n]
+    return MarketSummary(
+        coin_id=str(coin_id),
+        exchange_count=len(by_exchange),
+        pair_count=len(markets or ()),
+        total_volume_usd=total,
+        vwap_usd=weighted_price / traded if traded else None,
+        top_exchanges=tuple(ExchangeVolume(name, volume, volume / total if total else 0.0) for name, volume in top),
+        computed_at=time.time(),
+    )
+
+class MarketsService:
+    """Per-coin market summaries, cached for the markets TTL.
+
+    The raw pair list is fetched uncached, reduced immediately and
+    dropped; only the compact summary is kept. Concurrent requests for the
+    same coin share one fetch, and a stale summary is served if a refresh
+    fails.
+    """
+
+    def __init__(self, ttl=api.ENDPOINT_TTLS["markets"], top_n=TOP_EXCHANGES, max_entries=MAX_SUMMARIES):
+        self.ttl = ttl
+        self.top_n = top_n
+        self.cache = ResponseCache(memory=LRUCache(max_entries))
+
+    @tracing.traced
+    def get_summary(self, coin_id, fetch=None):
+        """Returns the MarketSummary for a coin, or None if its markets could not be fetched.
+
+        ``fetch`` overrides how the raw payload is loaded on a miss; the
+        async client passes one that runs on its own connection pool.
+        """
+        coin_id = str(coin_id)
+        fetch = fetch or api.fetch_coin_markets
+
+        def load():
+            markets = fetch(coin_id)
+            return summarize_markets(coin_id, markets, self.top_n) if markets is not None else None
+
+        summary = self.cache.get_or_fetch(coin_id, self.ttl, load)
+        if summary is None:
+            summary = self.cache.get(coin_id, allow_stale=True)
+        return summary
+
+    def get_fresh(self, coin_id):
+        """Returns a fresh cached summary without fetching, or None."""
+        summary = self.cache.get(str(coin_id))
+        if summary is not None:
+            self.cache.hits += 1
+        return summary
+
+    def stats(self):
+        """Returns hit/miss counters for the summary cache."""
+        stats = self.cache.stats()
+        stats.pop("disk", None)
+        return stats
+
+    def clear(self):
+        self.cache.clear()
+
+market_service = MarketsService()
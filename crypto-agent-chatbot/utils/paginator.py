@@ -0,0 +1,65 @@
+import contextvars
+import itertools
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from . import api, ingest
+
+PAGE_SIZE = 100  # CoinLore caps /tickers/ pages at 100 coins
+PAGE_CONCURRENCY = int(os.environ.get("COINLORE_PAGE_CONCURRENCY", 4))
+
+def fetch_ticker_page(start, limit=PAGE_SIZE):
+    """Returns (Tickers, total coin count) for one page, decoded straight into records."""
+    response = api.get_ticker_page(start, limit, object_hook=ingest.ticker_hook)
+    total = response.get('info', {}).get('coins_num')
+    return response.get('data', []), int(total) if total else None
+
+def iter_ticker_pages(max_coins=None, concurrency=PAGE_CONCURRENCY, page_size=PAGE_SIZE):
+    """Yields pages of Tickers in rank order, walking /tickers/ with bounded parallelism.
+
+    The first page reports how many coins exist; the remaining pages are
+    fetched ``concurrency`` at a time and yielded in order, so at most that
+    many pages are held beyond the one the caller is consuming. Stops early
+    on a short page or when ``max_coins`` is reached.
+    """
+    first, total = fetch_ticker_page(0, min(page_size, max_coins or page_size))
+    if not first:
+        return
+    yield first
+    if len(first) < page_size:
+        return
+    if total is None:
+        total = max_coins or page_size
+    if max_coins:
+        total = min(total, max_coins)
+    starts = iter(range(page_size, total, page_size))
+
+    def submit(pool, start):
+        # Copy per page so the scheduler lane and tracing span follow the request
+        return pool.submit(contextvars.copy_context().run, fetch_ticker_page, start, min(page_size, total - start))
+
+    pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="coinlore-pages")
+    pending = deque()
+    try:
+        for start in itertools.islice(starts, concurrency):
+            pending.append(submit(pool, start))
+        while pending:
+            page, _ = pending.popleft().result()
+            if not page:
+                return
+            start = next(starts, None)
+            if start is not None:
+                pending.append(submit(pool, start))
+            yield page
+            if len(page) < page_size:
+                return
+    finally:
+        for future in pending:
+            future.cancel()
+        pool.shutdown(wait=False)
+
+def iter_tickers(max_coins=None, concurrency=PAGE_CONCURRENCY):
+    """Yields Tickers one at a time in rank order."""
+    for page in iter_ticker_pages(max_coins, concurrency):
+        yield from page
@@ -0,0 +1,127 @@
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+from . import api, ingest
+from .scheduler import BACKGROUND, scheduler
+
+POLL_INTERVAL = float(os.environ.get("COINLORE_POLL_INTERVAL", 60))
+TOP_COINS_LIMIT = 100
+
+@dataclass(frozen=True)
+class MarketSnapshot:
+    """Immutable view of the market shared by every session.
+
+    Readers must treat ``df`` as read-only; the poller never mutates a
+    published snapshot, it only swaps in a new one.
+    """
+    global_stats: tuple
+    coins: tuple
+    df: pd.DataFrame
+    info: dict
+    fetched_at: float
+    by_id: dict = field(default_factory=dict, repr=False)
+
+    @property
+    def age_seconds(self):
+        """Seconds since this snapshot was fetched."""
+        return time.time() - self.fetched_at
+
+    def get_coin(self, coin_id):
+        """Returns the ticker row for a coin id if it is in the snapshot."""
+        return self.by_id.get(str(coin_id))
+
+EMPTY_SNAPSHOT = MarketSnapshot((), (), pd.DataFrame(), {}, 0.0)
+
+def fetch_snapshot():
+    """Pulls /global/ and /tickers/ and assembles a new snapshot."""
+    global_stats = api.get_global_stats()
+    top_coins = api.get_top_coins(TOP_COINS_LIMIT)
+    coins = tuple(top_coins.get('data', []))
+    if not global_stats and not coins:
+        return None
+    return MarketSnapshot(
+        global_stats=tuple(global_stats or ()),
+        coins=coins,
+        df=ingest.parse_tickers(coins),
+        info=dict(top_coins.get('info', {})),
+        fetched_at=time.time(),
+        by_id={str(coin['id']): coin for coin in coins},
+    )
+
+class MarketPoller:
+    """Background thread that refreshes the shared market snapshot."""
+
+    def __init__(self, interval=POLL_INTERVAL):
+        self.interval = interval
+        self.snapshot = EMPTY_SNAPSHOT
+        self.last_error = None
+        self._thread = None
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._listeners = []
+
+    def refresh(self):
+        """Fetches once and publishes the result; keeps the old snapshot on failure."""
+        try:
+            snapshot = fetch_snapshot()
+        except Exception as e:
+            self.last_error = e
+            snapshot = None
+        if snapshot is not None:
+            # A single attribute store, so readers see either the old or the new snapshot
+            self.snapshot = snapshot
+            self.last_error = None
+            for listener in list(self._listeners):
+                try:
+                    listener(snapshot)
+                except Exception as e:
+                    self.last_error = e
+        self._ready.set()
+        return snapshot is not None
+
+    def add_listener(self, listener):
+        """Registers a callable that receives every newly published snapshot."""
+        with self._lock:
+            if listener not in self._listeners:
+                self._listeners.append(listener)
+
+    def start(self):
+        """Starts the refresher thread once per process."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="market-poller", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        """Refreshes on a fixed schedule until stopped."""
+        while True:
+            # Background refreshes yield to interactive chat requests
+            with scheduler.lane(BACKGROUND):
+                self.refresh()
+            if self._stop.wait(self.interval):
+                break
+
+    def stop(self):
+        """Stops the refresher after its current cycle."""
+        self._stop.set()
+
+    def get_snapshot(self, timeout=15):
+        """Returns the latest snapshot, waiting only for the very first fetch."""
+        self.start()
+        self._ready.wait(timeout)
+        return self.snapshot
+
+_poller = MarketPoller()
+
+def get_poller():
+    """Returns the process-wide poller."""
+    return _poller
+
+def get_snapshot():
+    """Returns the latest market snapshot, starting the poller on first use."""
+    return _poller.get_snapshot()
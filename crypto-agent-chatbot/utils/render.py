@@ -0,0 +1,103 @@
+import threading
+from functools import lru_cache
+
+import pandas as pd
+
+# Source column -> display header, in table order
+TABLE_COLUMNS = {
+    'rank': 'Rank',
+    'symbol': 'Symbol',
+    'name': 'Name',
+    'price_usd': 'Price',
+    'percent_change_24h': '24h Change',
+    'market_cap_usd': 'Market Cap',
+    'volume24': '24h Volume',
+}
+
+TABLE_FORMATS = {
+    'price_usd': "${:,.2f}",
+    'percent_change_24h': "{:+.2f}%",
+    'market_cap_usd': "${:,.0f}",
+    'volume24': "${:,.0f}",
+}
+
+CARD_TEMPLATE = """
+<div class="coin-card">
+    <span class="coin-symbol">{symbol}</span>
+    <span class="coin-price">${price:,.2f}</span>
+    <span class="coin-change" style="color: {color}">{change:+.2f}%</span>
+</div>
+"""
+
+@lru_cache(maxsize=8192)
+def format_value(value, fmt):
+    """Formats a value once per (value, format) pair."""
+    return fmt.format(value)
+
+@lru_cache(maxsize=512)
+def render_card(symbol, price, change):
+    """Returns the sidebar card HTML for one coin, cached per price tick."""
+    color = "green" if change > 0 else "red"
+    return CARD_TEMPLATE.format(symbol=symbol, price=price, change=change, color=color)
+
+class TableRenderModel:
+    """Keeps the last rendered table and re-formats only the cells that changed.
+
+    The model is shared by every session in the process. Rendering the same
+    snapshot again returns the previous frame untouched, and a new snapshot
+    costs work proportional to the cells whose values moved.
+    """
+
+    def __init__(self, columns=TABLE_COLUMNS, formats=TABLE_FORMATS):
+        self.columns = columns
+        self.formats = formats
+        self.version = None
+        self.display = pd.DataFrame(columns=list(columns.values()))
+        self.last_diff = {"rows": 0, "rows_changed": 0, "cells_changed": 0}
+        self._values = {}  # coin id -> raw values of the last render
+        self._cells = {}  # coin id -> formatted cells of the last render
+        self._lock = threading.Lock()
+
+    def render(self, df, version):
+        """Returns the display frame for df, reusing unchanged rows and cells."""
+        with self._lock:
+            if version == self.version:
+                self.last_diff = {"rows": len(self.display), "rows_changed": 0, "cells_changed": 0}
+                return self.display
+
+            source = list(self.columns)
+            values, cells = {}, {}
+            rows_changed = cells_changed = 0
+            for coin_id, *row in df[['id', *source]].itertuples(index=False, name=None):
+                row = tuple(row)
+                previous = self._values.get(coin_id)
+                if previous == row:
+                    cells[coin_id] = self._cells[coin_id]
+                else:
+                    old_cells = self._cells.get(coin_id)
+                    new_cells = []
+                    for i, (column, value) in enumerate(zip(source, row)):
+                        if previous is not None and previous[i] == value:
+                            new_cells.append(old_cells[i])
+                            continue
+                        fmt = self.formats.get(column)
+                        new_cells.append(format_value(value, fmt) if fmt else value)
+                        cells_changed += 1
+                    cells[coin_id] = tuple(new_cells)
+                    rows_changed += 1
+                values[coin_id] = row
+
+            self._values, self._cells = values, cells
+            self.display = pd.DataFrame(list(cells.values()), columns=list(self.columns.values()))
+            self.version = version
+            self.last_diff = {"rows": len(cells), "rows_changed": rows_changed, "cells_changed": cells_changed}
+            return self.display
+
+def render_coin_cards(df):
+    """Returns the combined sidebar card HTML for the given coins."""
+    return "".join(
+        render_card(symbol, price, change)
+        for symbol, price, change in df[['symbol', 'price_usd', 'percent_change_24h']].itertuples(index=False, name=None)
+    )
+
+market_table = TableRenderModel()
@@ -0,0 +1,193 @@
+import re
+import threading
+from dataclasses import dataclass
+
+from . import coin_index
+
+# Coins every router knows about, even before the coin index has loaded
+DEFAULT_ALIASES = {
+    "bitcoin": "btc", "btc": "btc",
+    "ethereum": "eth", "ether": "eth", "eth": "eth",
+    "binance": "bnb", "binance coin": "bnb", "bnb": "bnb",
+    "ripple": "xrp", "xrp": "xrp",
+    "dogecoin": "doge", "doge": "doge",
+}
+
+# Index symbols that are also everyday words would fire on ordinary chat
+STOPWORDS = frozenset({
+    "a", "i", "an", "and", "are", "at", "be", "by", "can", "do", "for", "get", "go",
+    "how", "in", "is", "it", "me", "my", "new", "not", "now", "of", "on", "one",
+    "or", "so", "the", "to", "top", "up", "us", "we", "what", "who", "why", "you",
+    "price", "market", "stats", "global", "show", "tell", "about", "coin", "coins",
+})
+
+# Words that mark the token next to them as a coin, e.g. "gas price", "about sun"
+CUE_WORDS = frozenset({"price", "prices", "cost", "ticker", "about", "details", "info", "coin", "token"})
+# Skipped when looking for a neighbouring cue word: "price of the sun", "sun's price"
+FILLER_WORDS = frozenset({"of", "the", "s"})
+
+KEYWORDS = {
+    "price": "price", "prices": "price", "cost": "price", "worth": "price",
+    "top": "top",
+    "global": "global", "market": "global", "markets": "global", "stats": "global",
+    "statistics": "global",
+}
+
+DEFAULT_TOP_N = 10
+MAX_TOP_N = 100
+INDEX_ROUTER_COINS = 500  # how many ranked index coins feed the phrase table
+
+@dataclass(frozen=True)
+class Intent:
+    """Structured result of classifying one chat message."""
+    kind: str  # "price", "top", "global", "details" or "chat"
+    coins: tuple = ()
+    n: int = None
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+# Same tokens on the original message, keeping case and a leading "$"
+RAW_TOKEN_RE = re.compile(r"\$?[A-Za-z0-9]+")
+
+class IntentRouter:
+    """Classifies chat messages in one pass over their tokens.
+
+    Every known coin name, symbol and keyword is compiled once into a phrase
+    table keyed by its token sequence, so classification is a handful of
+    dict lookups per word rather than a scan of the coin list.
+
+    ``aliases`` match as bare words. ``tickers`` are single words taken
+    from the coin index, where plenty of symbols are everyday words (TIME,
+    GAS, WIN), so they only count when written in capitals or with a "$",
+    when capitalised mid-sentence like a proper noun ("about Solana and
+    Cardano"), or when a cue word such as "price" or "about" sits next to them.
+    """
+
+    def __init__(self, aliases, tickers=None):
+        self.aliases = {}
+        for term, symbol in aliases.items():
+            phrase = " ".join(TOKEN_RE.findall(term))
+            if phrase:
+                self.aliases.setdefault(phrase, symbol)
+        self.tickers = {}
+        for term, symbol in (tickers or {}).items():
+            phrase = " ".join(TOKEN_RE.findall(term))
+            if phrase and phrase not in self.aliases:
+                self.tickers.setdefault(phrase, symbol)
+        self.phrases = {**self.tickers, **self.aliases, **{k: None for k in KEYWORDS}}
+        # First word of every multi-word phrase -> widest phrase starting with it
+        self.phrase_widths = {}
+        for phrase in self.phrases:
+            words = phrase.split(" ")
+            if len(words) > 1:
+                self.phrase_widths[words[0]] = max(self.phrase_widths.get(words[0], 1), len(words))
+
+    @classmethod
+    def from_coins(cls, coins):
+        """Builds a router from (symbol, name) pairs plus the default aliases.
+
+        Multi-word names match as bare words; symbols and one-word names
+        need a cue (see the class docstring).
+        """
+        aliases, tickers = dict(DEFAULT_ALIASES), {}
+        for symbol, name in coins:
+            symbol, name = symbol.lower(), name.lower()
+            if symbol not in STOPWORDS and len(symbol) > 1:
+                tickers.setdefault(symbol, symbol)
+            if " " in name.strip():
+                aliases.setdefault(name, symbol)
+            elif name not in STOPWORDS:
+                tickers.setdefault(name, symbol)
+        return cls(aliases, tickers)
+
+    @staticmethod
+    def _has_cue(message, matches, tokens, i, shouting):
+        """Whether the ticker at ``i`` is written as one or sits next to a cue word."""
+        raw = matches[i].group()
+        if raw[0] == "$":
+            return True
+        if not shouting and raw[0].isupper():
+            if raw.isupper() and len(raw) > 1:
+                return True
+            # Capitalised like a name, unless that is just the start of a sentence
+            before = message[:matches[i].start()].rstrip()
+            if before and before[-1] not in ".!?":
+                return True
+        for step in (-1, 1):
+            j = i + step
+            while 0 <= j < len(tokens) and tokens[j] in FILLER_WORDS:
+                j += step
+            if 0 <= j < len(tokens) and tokens[j] in CUE_WORDS:
+                return True
+        return False
+
+    def route(self, message):
+        """Returns the Intent for a message."""
+        keywords, coins, numbers = set(), [], []
+        matches = list(RAW_TOKEN_RE.finditer(message))
+        tokens = [match.group().lstrip("$").lower() for match in matches]
+        # An all-caps message says nothing about which words are tickers
+        shouting = message.isupper()
+        phrases, phrase_widths, tickers = self.phrases, self.phrase_widths, self.tickers
+        i = 0
+        while i < len(tokens):
+            token = tokens[i]
+            if token.isdigit():
+                numbers.append(int(token))
+                i += 1
+                continue
+            phrase, width = None, 1
+            # Longest phrase first so "binance coin" wins over "binance"
+            for width in range(min(phrase_widths.get(token, 1), len(tokens) - i), 1, -1):
+                candidate = " ".join(tokens[i:i + width])
+                if candidate in phrases:
+                    phrase = candidate
+                    break
+            else:
+                width = 1
+                if token in phrases:
+                    phrase = token
+            if phrase is None:
+                i += 1
+                continue
+            if phrase in KEYWORDS:
+                keywords.add(KEYWORDS[phrase])
+            elif phrase in tickers and not self._has_cue(message, matches, tokens, i, shouting):
+                i += 1
+                continue
+            else:
+                symbol = phrases[phrase]
+                if symbol not in coins:
+                    coins.append(symbol)
+            i += width
+
+        if "price" in keywords and coins:
+            return Intent("price", tuple(coins))
+        if "top" in keywords:
+            n = next((n for n in numbers if n >= 1), DEFAULT_TOP_N)
+            return Intent("top", n=min(n, MAX_TOP_N))
+        if "global" in keywords:
+            return Intent("global")
+        if coins:
+            return Intent("details", tuple(coins))
+        return Intent("chat")
+
+_router = None
+_router_built_at = None
+_lock = threading.Lock()
+
+def get_router():
+    """Returns the shared router, rebuilding it when the coin index refreshes."""
+    global _router, _router_built_at
+    index = coin_index.get_index()
+    if _router is None or _router_built_at != index.built_at:
+        with _lock:
+            if _router is None or _router_built_at != index.built_at:
+                coins = sorted(index.coins.values(), key=lambda c: c.rank)
+                pairs = [(c.symbol, c.name) for c in coins[:INDEX_ROUTER_COINS]]
+                _router = IntentRouter.from_coins(pairs)
+                _router_built_at = index.built_at
+    return _router
+
+def route(message):
+    """Classifies a message with the shared router."""
+    return get_router().route(message)
@@ -0,0 +1,174 @@
+import asyncio
+import contextlib
+import contextvars
+import heapq
+import itertools
+import os
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+RATE_PER_SECOND = float(os.environ.get("COINLORE_RATE_LIMIT", 5))
+BURST = int(os.environ.get("COINLORE_RATE_BURST", 10))
+DEFAULT_BACKOFF = 2.0  # seconds to pause after a 429 without Retry-After
+MAX_BACKOFF = 60.0
+
+# Priority lanes: lower values are served first
+INTERACTIVE = 0
+BACKGROUND = 1
+LANE_NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background"}
+
+_current_lane = contextvars.ContextVar("coinlore_lane", default=INTERACTIVE)
+
+def parse_retry_after(value):
+    """Returns the delay in seconds from a Retry-After header, or None."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+class RequestScheduler:
+    """Token-bucket rate limiter with priority lanes, shared by every API call.
+
+    Waiters queue in a heap ordered by (lane, arrival), so chat requests are
+    granted tokens ahead of background refreshes. A 429 pauses the whole
+    bucket until the upstream Retry-After has passed.
+    """
+
+    def __init__(self, rate=RATE_PER_SECOND, burst=BURST):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._queue = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self.max_queue_depth = 0
+        self.throttled = 0
+        self.stale_served = 0
+        self.lanes = {lane: {"granted": 0, "wait_s": 0.0, "max_wait_s": 0.0} for lane in LANE_NAMES}
+
+    def _refill(self, now):
+        """Adds the tokens accrued since the last update, capped at the burst size."""
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _enqueue(self, lane):
+        """Queues a ticket for the lane; call with the condition held."""
+        ticket = (lane, next(self._seq))
+        heapq.heappush(self._queue, ticket)
+        self.max_queue_depth = max(self.max_queue_depth, len(self._queue))
+        return ticket
+
+    def _try_grant(self, ticket):
+        """Takes a token for ticket if it is its turn, else returns how long to wait.
+
+        Call with the condition held. Returns None once the token is taken.
+        """
+        now = time.monotonic()
+        self._refill(now)
+        if self._queue[0] == ticket and now >= self._paused_until and self._tokens >= 1:
+            heapq.heappop(self._queue)
+            self._tokens -= 1
+            # Wake the next waiter so it can check whether a token is ready for it
+            self._cond.notify_all()
+            return None
+        if now < self._paused_until:
+            return self._paused_until - now
+        return max((1 - self._tokens) / self.rate, 0.001)
+
+    def _record(self, lane, started):
+        waited = time.monotonic() - started
+        stats = self.lanes[lane]
+        stats["granted"] += 1
+        stats["wait_s"] += waited
+        stats["max_wait_s"] = max(stats["max_wait_s"], waited)
+        return waited
+
+    def acquire(self, lane=None):
+        """Blocks until the caller's lane may send one request."""
+        lane = _current_lane.get() if lane is None else lane
+        started = time.monotonic()
+        with self._cond:
+            ticket = self._enqueue(lane)
+            while (delay := self._try_grant(ticket)) is not None:
+                self._cond.wait(delay)
+        return self._record(lane, started)
+
+    async def acquire_async(self, lane=None):
+        """Awaits until the caller's lane may send one request, without blocking the loop.
+
+        Shares the queue with acquire(), but waits with asyncio.sleep, so it
+        never needs an executor thread that may already be busy.
+        """
+        lane = _current_lane.get() if lane is None else lane
+        started = time.monotonic()
+        with self._cond:
+            ticket = self._enqueue(lane)
+        try:
+            while True:
+                with self._cond:
+                    delay = self._try_grant(ticket)
+                if delay is None:
+                    break
+                await asyncio.sleep(delay)
+        except BaseException:
+            # Cancelled while queued: give up the place so later waiters are not stuck behind it
+            with self._cond:
+                if ticket in self._queue:
+                    self._queue.remove(ticket)
+                    heapq.heapify(self._queue)
+                    self._cond.notify_all()
+            raise
+        return self._record(lane, started)
+
+    def throttle(self, retry_after=None):
+        """Pauses every lane after an upstream rate-limit response."""
+        delay = min(retry_after if retry_after is not None else DEFAULT_BACKOFF, MAX_BACKOFF)
+        with self._cond:
+            self.throttled += 1
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+            self._tokens = 0.0
+            self._cond.notify_all()
+        return delay
+
+    def is_throttled(self):
+        """True while a Retry-After pause is in effect."""
+        return time.monotonic() < self._paused_until
+
+    @contextlib.contextmanager
+    def lane(self, lane):
+        """Runs the enclosed API calls in the given priority lane."""
+        token = _current_lane.set(lane)
+        try:
+            yield
+        finally:
+            _current_lane.reset(token)
+
+    def stats(self):
+        """Returns queue depth, wait times per lane and throttling counters."""
+        lanes = {}
+        for lane, stats in self.lanes.items():
+            granted = stats["granted"]
+            lanes[LANE_NAMES[lane]] = {
+                **stats,
+                "avg_wait_s": stats["wait_s"] / granted if granted else 0.0,
+            }
+        return {
+            "queue_depth": len(self._queue),
+            "max_queue_depth": self.max_queue_depth,
+            "tokens": round(self._tokens, 2),
+            "paused_for_s": max(self._paused_until - time.monotonic(), 0.0),
+            "throttled_responses": self.throttled,
+            "stale_served": self.stale_served,
+            "lanes": lanes,
+        }
+
+scheduler = RequestScheduler()
@@ -0,0 +1,191 @@
+import os
+import sqlite3
+import threading
+import time
+
+HISTORY_DB_PATH = os.environ.get("COINLORE_HISTORY_DB", os.path.join("data", "price_history.sqlite"))
+
+# Rollup resolution -> (bucket width in seconds, retention in seconds or None)
+ROLLUPS = {
+    "1m": (60, 14 * 86400),
+    "1h": (3600, 365 * 86400),
+    "1d": (86400, None),
+}
+RAW_RETENTION = 2 * 86400
+PRUNE_EVERY = 3600
+MAX_CHART_POINTS = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ticks (
+    coin_id TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    price REAL NOT NULL,
+    market_cap REAL,
+    volume REAL,
+    PRIMARY KEY (coin_id, ts)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rollups (
+    coin_id TEXT NOT NULL,
+    resolution TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    open REAL NOT NULL,
+    high REAL NOT NULL,
+    low REAL NOT NULL,
+    close REAL NOT NULL,
+    samples INTEGER NOT NULL,
+    PRIMARY KEY (coin_id, resolution, bucket)
+) WITHOUT ROWID;
+"""
+
+UPSERT_ROLLUP = """
+INSERT INTO rollups (coin_id, resolution, bucket, open, high, low, close, samples)
+VALUES (?, ?, ?, ?, ?, ?, ?, 1)
+ON CONFLICT (coin_id, resolution, bucket) DO UPDATE SET
+    high = max(high, excluded.high),
+    low = min(low, excluded.low),
+    close = excluded.close,
+    samples = samples + 1
+"""
+
+def lttb(xs, ys, threshold):
+    """Largest-Triangle-Three-Buckets downsampling to at most threshold points.
+
+    Keeps the first and last points and, from each bucket in between, the
+    point forming the largest triangle with its neighbours, which preserves
+    the visual shape of the series far better than plain striding.
+    """
+    n = len(xs)
+    if threshold >= n or threshold < 3:
+        return list(xs), list(ys)
+    out_x, out_y = [xs[0]], [ys[0]]
+    every = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        # Average of the next bucket is the third triangle vertex
+        next_start = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        span = next_end - next_start
+        avg_x = sum(xs[next_start:next_end]) / span
+        avg_y = sum(ys[next_start:next_end]) / span
+
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        ax, ay = xs[a], ys[a]
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        out_x.append(xs[best])
+        out_y.append(ys[best])
+        a = best
+    out_x.append(xs[-1])
+    out_y.append(ys[-1])
+    return out_x, out_y
+
+def resolution_for(span_seconds, max_points=MAX_CHART_POINTS):
+    """Picks the coarsest data that still gives about max_points over the span."""
+    if span_seconds <= 2 * 3600:
+        return "raw"
+    for name, (width, _) in ROLLUPS.items():
+        if span_seconds / width <= max_points * 4:
+            return name
+    return "1d"
+
+class PriceHistoryStore:
+    """Append-only SQLite store of ticker prices with 1m/1h/1d rollups."""
+
+    def __init__(self, path=HISTORY_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._last_prune = 0.0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connect().executescript(SCHEMA)
+
+    def _connect(self):
+        # sqlite3 connections may not cross threads, so keep one per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def record_snapshot(self, snapshot):
+        """Appends one tick per coin from a market snapshot and updates the rollups."""
+        ts = int(snapshot.fetched_at)
+        ticks, rollups = [], []
+        for coin in snapshot.coins:
+            try:
+                price = float(coin['price_usd'])
+            except (KeyError, TypeError, ValueError):
+                continue
+            ticks.append((coin['id'], ts, price, _float_or_none(coin.get('market_cap_usd')), _float_or_none(coin.get('volume24'))))
+            for name, (width, _) in ROLLUPS.items():
+                rollups.append((coin['id'], name, ts - ts % width, price, price, price, price))
+        conn = self._connect()
+        with conn:
+            conn.executemany("INSERT OR IGNORE INTO ticks VALUES (?, ?, ?, ?, ?)", ticks)
+            conn.executemany(UPSERT_ROLLUP, rollups)
+        if ts - self._last_prune >= PRUNE_EVERY:
+            self.prune(ts)
+
+    def prune(self, now=None):
+        """Drops raw ticks and rollups past their retention."""
+        now = int(now or time.time())
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM ticks WHERE ts < ?", (now - RAW_RETENTION,))
+            for name, (_, retention) in ROLLUPS.items():
+                if retention is not None:
+                    conn.execute("DELETE FROM rollups WHERE resolution = ? AND bucket < ?", (name, now - retention))
+        self._last_prune = now
+
+    def get_series(self, coin_id, start, end=None, resolution=None):
+        """Returns (timestamps, closing prices) for a coin between start and end."""
+        end = int(end or time.time())
+        resolution = resolution or resolution_for(end - start)
+        if resolution == "raw":
+            rows = self._connect().execute(
+                "SELECT ts, price FROM ticks WHERE coin_id = ? AND ts BETWEEN ? AND ? ORDER BY ts",
+                (coin_id, start, end),
+            ).fetchall()
+        else:
+            rows = self._connect().execute(
+                "SELECT bucket, close FROM rollups WHERE coin_id = ? AND resolution = ? "
+                "AND bucket BETWEEN ? AND ? ORDER BY bucket",
+                (coin_id, resolution, start, end),
+            ).fetchall()
+        return [r[0] for r in rows], [r[1] for r in rows]
+
+    def get_chart_series(self, coin_ids, days, max_points=MAX_CHART_POINTS):
+        """Returns LTTB-reduced series for several coins, ready to plot."""
+        end = int(time.time())
+        start = end - int(days * 86400)
+        series = {}
+        for coin_id in coin_ids:
+            xs, ys = self.get_series(coin_id, start, end)
+            if xs:
+                series[coin_id] = lttb(xs, ys, max_points)
+        return series
+
+def _float_or_none(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_store():
+    """Returns the process-wide history store."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = PriceHistoryStore()
+    return _store
@@ -0,0 +1,210 @@
+import contextlib
+import contextvars
+import functools
+import inspect
+import json
+import os
+import secrets
+import threading
+import time
+from collections import deque
+
+TRACING_ENABLED = os.environ.get("CHAT_TRACING", "1") != "0"
+TRACE_EXPORT_PATH = os.environ.get("CHAT_TRACE_EXPORT")
+TRACE_HISTORY = int(os.environ.get("CHAT_TRACE_HISTORY", 50))
+SERVICE_NAME = "crypto-agent-chatbot"
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+class Trace:
+    """The spans of one request, collected as they finish."""
+
+    def __init__(self, name):
+        self.name = name
+        self.trace_id = secrets.token_hex(16)
+        self.spans = []
+
+    def waterfall(self):
+        """Returns spans ordered by start time with offsets from the root in milliseconds."""
+        if not self.spans:
+            return []
+        by_id = {span.span_id: span for span in self.spans}
+        depths = {}
+
+        def depth(span):
+            if span.span_id not in depths:
+                parent = by_id.get(span.parent_id)
+                depths[span.span_id] = depth(parent) + 1 if parent is not None else 0
+            return depths[span.span_id]
+
+        # Parents sort before children even when the clock gives them the same start
+        spans = sorted(self.spans, key=lambda s: (s.start_ns, depth(s)))
+        origin = spans[0].start_ns
+        rows = []
+        for span in spans:
+            rows.append({
+                "name": span.name,
+                "depth": depths[span.span_id],
+                "start_ms": (span.start_ns - origin) / 1e6,
+                "duration_ms": span.duration_ms,
+                "status": span.status,
+                "attributes": span.attributes,
+            })
+        return rows
+
+class Span:
+    """One timed operation; field names follow the OpenTelemetry span model."""
+
+    __slots__ = ("name", "trace", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "status", "error")
+
+    def __init__(self, name, trace, parent_id=None, attributes=None):
+        self.name = name
+        self.trace = trace
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = dict(attributes or {})
+        self.status = "ok"
+        self.error = None
+
+    @property
+    def duration_ms(self):
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def to_record(self):
+        """Returns the span as an OTLP/JSON span object."""
+        record = {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [{"key": k, "value": _attribute_value(v)} for k, v in self.attributes.items()],
+            "status": {"code": 2, "message": self.error} if self.status == "error" else {"code": 1},
+        }
+        if self.parent_id:
+            record["parentSpanId"] = self.parent_id
+        return record
+
+def _attribute_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+class Tracer:
+    """Records nested spans per request and keeps the most recent traces.
+
+    The active span lives in a context variable, so spans opened inside
+    asyncio tasks and asyncio.to_thread workers attach to the request that
+    started them. Finished traces are optionally appended to a JSON lines
+    file, one OTLP span record per line.
+    """
+
+    def __init__(self, enabled=TRACING_ENABLED, export_path=TRACE_EXPORT_PATH, history=TRACE_HISTORY):
+        self.enabled = enabled
+        self.export_path = export_path
+        self.traces = deque(maxlen=history)
+        self._export_lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def span(self, name, **attributes):
+        """Times the enclosed block as a child of the active span, or as a new trace."""
+        if not self.enabled:
+            yield None
+            return
+        parent = _current_span.get()
+        trace = parent.trace if parent is not None else Trace(name)
+        span = Span(name, trace, parent.span_id if parent is not None else None, attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            if not isinstance(e, GeneratorExit):
+                span.status, span.error = "error", f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.end_ns = time.time_ns()
+            try:
+                _current_span.reset(token)
+            except ValueError:
+                # A traced generator was closed from a different context
+                pass
+            trace.spans.append(span)
+            if parent is None:
+                self.finish(trace)
+
+    @contextlib.contextmanager
+    def trace(self, name, **attributes):
+        """Like span, but yields the whole Trace so callers can inspect it afterwards."""
+        with self.span(name, **attributes) as span:
+            yield span.trace if span is not None else Trace(name)
+
+    def finish(self, trace):
+        self.traces.append(trace)
+        if self.export_path:
+            self.export(trace, self.export_path)
+
+    def export(self, trace, path):
+        """Appends a trace to a JSON lines file, one span record per line."""
+        lines = "".join(json.dumps(span.to_record()) + "\n" for span in trace.spans)
+        with self._export_lock, open(path, "a") as f:
+            f.write(lines)
+
+    def recent(self):
+        return list(self.traces)
+
+def traced(func=None, *, name=None):
+    """Decorator that wraps each call of a function, coroutine or generator in a span."""
+    if func is None:
+        return functools.partial(traced, name=name)
+    span_name = name or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__qualname__}"
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            with tracer.span(span_name):
+                return await func(*args, **kwargs)
+        return async_wrapper
+
+    if inspect.isgeneratorfunction(func):
+        @functools.wraps(func)
+        def generator_wrapper(*args, **kwargs):
+            with tracer.span(span_name):
+                yield from func(*args, **kwargs)
+        return generator_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with tracer.span(span_name):
+            return func(*args, **kwargs)
+    return wrapper
+
+def set_attribute(key, value):
+    """Sets an attribute on the active span, if any."""
+    span = _current_span.get()
+    if span is not None:
+        span.set_attribute(key, value)
+
+def to_otlp(traces, service_name=SERVICE_NAME):
+    """Wraps traces in an OTLP/JSON ExportTraceServiceRequest body for a collector."""
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": service_name}}]},
+            "scopeSpans": [{
+                "scope": {"name": __name__},
+                "spans": [span.to_record() for trace in traces for span in trace.spans],
+            }],
+        }]
+    }
+
+tracer = Tracer()
+span = tracer.span
@@ -0,0 +1,123 @@
+"""Benchmark: per-user reads through the task index vs. scanning tasks_db.
+
+Grows the store to 1M tasks spread over many users while one user keeps
+100 tasks, and times the per-user helpers at each size. Then times stats
+and deadlines for a single user with up to 100k tasks. Run from the
+project directory:
+
+    python -m benchmarks.bench_repository
+"""
+import random
+import timeit
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+import main as tracker
+from main import TaskCategory, TaskPriority, TaskStatus
+from repository import TaskRepository
+
+SIZES = (10_000, 100_000, 1_000_000)
+TARGET_USER = 1
+TARGET_TASKS = 100
+OTHER_USERS = 1_000
+WORDS = ["report", "review", "plan", "call", "draft", "fix", "study", "gym", "budget", "email"]
+
+def make_task(rng, user_id, now, today):
+    return {
+        "title": f"{rng.choice(WORDS)} {rng.choice(WORDS)}",
+        "description": f"{rng.choice(WORDS)} notes",
+        "due_date": today + timedelta(days=rng.randrange(60)),
+        "status": rng.choice(list(TaskStatus)),
+        "priority": rng.choice(list(TaskPriority)),
+        "category": rng.choice(list(TaskCategory)),
+        "tags": [rng.choice(WORDS)],
+        "estimated_hours": None,
+        "progress_percentage": rng.randrange(101),
+        "user_id": user_id,
+        "created_at": now,
+        "updated_at": now,
+        "reminder_date": None,
+    }
+
+def legacy_user_tasks(user_id):
+    return [t for t in tracker.repo.tasks.values() if t["user_id"] == user_id]
+
+def legacy_stats(user_tasks):
+    """The old calculate_user_stats body: five passes over the user's tasks."""
+    stats = {
+        "total_tasks": len(user_tasks),
+        "completed_tasks": len([t for t in user_tasks if t["status"] == TaskStatus.COMPLETED]),
+        "urgent_tasks": len([t for t in user_tasks if t["priority"] == TaskPriority.URGENT]),
+        "overdue_tasks": len([t for t in user_tasks if t["due_date"] < date.today() and t["status"] != TaskStatus.COMPLETED]),
+        "tasks_by_category": defaultdict(int),
+        "average_progress": 0
+    }
+    if user_tasks:
+        stats["average_progress"] = sum(t["progress_percentage"] for t in user_tasks) / len(user_tasks)
+        for task in user_tasks:
+            stats["tasks_by_category"][task["category"]] += 1
+    return stats
+
+def legacy_calls(user_id):
+    """The pre-index helpers: every call scans all tasks."""
+    future_date = date.today() + timedelta(days=7)
+    return {
+        "get_user": lambda: len(legacy_user_tasks(user_id)),
+        "stats": lambda: legacy_stats(legacy_user_tasks(user_id)),
+        "deadlines": lambda: [t for t in legacy_user_tasks(user_id) if t["due_date"] <= future_date and t["status"] != TaskStatus.COMPLETED],
+        "search": lambda: [t for t in legacy_user_tasks(user_id) if "report" in t["title"].lower()],
+    }
+
+def indexed_calls(user_id):
+    return {
+        "get_user": lambda: tracker.repo.count_user_tasks(user_id),
+        "stats": lambda: tracker.calculate_user_stats(user_id),
+        "deadlines": lambda: tracker.get_upcoming_deadlines(user_id, 7),
+        "search": lambda: tracker.repo.search_tasks(user_id, "report"),
+    }
+
+def per_call_us(fn, budget=0.2):
+    number = max(1, int(budget / max(timeit.timeit(fn, number=1), 1e-7)))
+    return min(timeit.repeat(fn, number=number, repeat=3)) / number * 1e6
+
+def main():
+    rng = random.Random(42)
+    now, today = datetime.now(), date.today()
+    tracker.repo = TaskRepository()
+    for user_id in range(1, OTHER_USERS + 2):
+        tracker.repo.add_user({"username": f"user{user_id}"})
+    for _ in range(TARGET_TASKS):
+        tracker.repo.add_task(make_task(rng, TARGET_USER, now, today))
+
+    print(f"user {TARGET_USER} has {TARGET_TASKS} tasks; times are per call in microseconds\n")
+    print(f"{'total tasks':>12} {'call':<10} {'indexed':>10} {'scan':>12}")
+    for size in SIZES:
+        while len(tracker.repo.tasks) < size:
+            tracker.repo.add_task(make_task(rng, rng.randrange(2, OTHER_USERS + 2), now, today))
+        legacy = legacy_calls(TARGET_USER)
+        for name, fn in indexed_calls(TARGET_USER).items():
+            print(f"{size:>12,} {name:<10} {per_call_us(fn):>10.1f} {per_call_us(legacy[name], 0.5):>12.1f}")
+
+    # Stats and deadlines read per-user indexes, so a user's own task count matters little too
+    print(f"\n{'user tasks':>12} {'call':<10} {'indexed':>10} {'user scan':>12}")
+    heavy_user = OTHER_USERS + 2
+    tracker.repo.add_user({"username": "heavy"})
+    future_date = today + timedelta(days=7)
+    for size in (100, 10_000, 100_000):
+        while tracker.repo.count_user_tasks(heavy_user) < size:
+            tracker.repo.add_task(make_task(rng, heavy_user, now, today))
+        user_tasks = tracker.repo.user_tasks(heavy_user)
+        open_soon = lambda: sorted(
+            (t for t in user_tasks if t["due_date"] <= future_date and t["status"] != TaskStatus.COMPLETED),
+            key=lambda t: t["due_date"],
+        )
+        calls = {
+            "stats": (lambda: tracker.calculate_user_stats(heavy_user), lambda: legacy_stats(user_tasks)),
+            "deadlines": (lambda: tracker.get_upcoming_deadlines(heavy_user, 7), open_soon),
+            "next 10": (lambda: tracker.get_upcoming_deadlines(heavy_user, 30, 10), lambda: open_soon()[:10]),
+        }
+        for name, (indexed, scan) in calls.items():
+            print(f"{size:>12,} {name:<10} {per_call_us(indexed):>10.1f} {per_call_us(scan):>12.1f}")
+
+if __name__ == "__main__":
+    main()
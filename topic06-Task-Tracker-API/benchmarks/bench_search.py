@@ -0,0 +1,103 @@
+"""Benchmark: /tasks/search/ through the inverted index vs. the old filter chain.
+
+Loads one user with 100k tasks whose titles and descriptions draw from a
+5k-word vocabulary with Zipf-like frequencies, then times searches for
+common, mid-frequency and rare words and for filters, each as a full
+result set and as a first page of 20. The scan column is the
+pre-index endpoint body: substring checks on every title and description
+followed by one list comprehension per filter. Run from the project
+directory:
+
+    python -m benchmarks.bench_search
+"""
+import random
+import time
+from datetime import date, datetime
+from itertools import accumulate
+
+from benchmarks.bench_repository import make_task, per_call_us
+from main import TaskCategory, TaskPriority, TaskStatus
+from repository import TaskRepository
+
+USER_ID = 1
+USER_TASKS = 100_000
+PAGE = 20
+VOCABULARY = 5_000
+SYLLABLES = ["ka", "lo", "mi", "ren", "sto", "pa", "vel", "dor", "qui", "ne", "tra", "bu"]
+
+def make_vocabulary(rng):
+    """Pronounceable made-up words, most frequent first"""
+    words = set()
+    while len(words) < VOCABULARY:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    words = sorted(words)
+    rng.shuffle(words)
+    return words
+
+def make_text(rng, vocabulary, cum_weights, low, high):
+    return " ".join(rng.choices(vocabulary, cum_weights=cum_weights, k=rng.randint(low, high)))
+
+def legacy_search(repo, user_id, query=None, category=None, priority=None, status=None, tag=None):
+    tasks = repo.user_tasks(user_id)
+
+    if query:
+        tasks = [t for t in tasks if query.lower() in t["title"].lower() or
+                (t["description"] and query.lower() in t["description"].lower())]
+    if category:
+        tasks = [t for t in tasks if t["category"] == category]
+    if priority:
+        tasks = [t for t in tasks if t["priority"] == priority]
+    if status:
+        tasks = [t for t in tasks if t["status"] == status]
+    if tag:
+        tasks = [t for t in tasks if tag in t["tags"]]
+
+    return tasks
+
+def main():
+    rng = random.Random(42)
+    now, today = datetime.now(), date.today()
+    vocabulary = make_vocabulary(rng)
+    # Zipf-like word frequencies, as in real task titles and notes
+    cum_weights = list(accumulate(1 / rank for rank in range(1, VOCABULARY + 1)))
+    tags = vocabulary[:50]
+    tasks = []
+    for _ in range(USER_TASKS):
+        task = make_task(rng, USER_ID, now, today)
+        task["title"] = make_text(rng, vocabulary, cum_weights, 2, 5)
+        task["description"] = make_text(rng, vocabulary, cum_weights, 0, 12) or None
+        task["tags"] = rng.sample(tags, rng.randint(0, 3))
+        tasks.append(task)
+
+    repo = TaskRepository()
+    repo.add_user({"username": "searcher"})
+    started = time.perf_counter()
+    for task in tasks:
+        repo.add_task(task)
+    elapsed = time.perf_counter() - started
+    print(f"user {USER_ID} has {USER_TASKS:,} tasks; indexed on insert at {elapsed / USER_TASKS * 1e6:.1f}us per task")
+    print(f"times are per call in microseconds; page = first {PAGE} matches\n")
+
+    common, mid, rare = vocabulary[2], vocabulary[60], vocabulary[2_000]
+    searches = {
+        "common word": (common, {}),
+        "mid word": (mid, {}),
+        "rare word": (rare, {}),
+        "prefix": (rare[:5], {}),
+        "2 words": (f"{common} {mid}", {}),
+        "word+cat": (mid, {"category": TaskCategory.WORK}),
+        "priority": (None, {"priority": TaskPriority.URGENT}),
+        "tag+status": (None, {"tag": tags[10], "status": TaskStatus.TODO}),
+        "all filters": (common, {"category": TaskCategory.PERSONAL, "priority": TaskPriority.HIGH,
+                                 "status": TaskStatus.IN_PROGRESS, "tag": tags[0]}),
+    }
+    print(f"{'search':<12} {'matches':>8} {'index':>10} {'index page':>11} {'scan':>10}")
+    for name, (query, filters) in searches.items():
+        matches = len(repo.search_tasks(USER_ID, query, filters))
+        full = per_call_us(lambda: repo.search_tasks(USER_ID, query, filters))
+        page = per_call_us(lambda: repo.search_tasks(USER_ID, query, filters, 0, PAGE))
+        scan = per_call_us(lambda: legacy_search(repo, USER_ID, query, **filters), 0.5)
+        print(f"{name:<12} {matches:>8,} {full:>10.1f} {page:>11.1f} {scan:>10.1f}")
+
+if __name__ == "__main__":
+    main()
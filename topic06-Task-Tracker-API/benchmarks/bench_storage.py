@@ -0,0 +1,72 @@
+"""Benchmark: the in-memory TaskRepository vs. the SQLite store.
+
+Loads the same 100k tasks, spread over 100 users, into both backends and
+times each storage call the endpoints make for one user. The SQLite file
+lives in a temporary directory; its "reopen" row is what a restarted
+worker pays before serving again. Run from the project directory:
+
+    python -m benchmarks.bench_storage
+"""
+import os
+import random
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+from benchmarks.bench_repository import make_task, per_call_us
+from main import TaskPriority, TaskStatus
+from repository import TaskRepository
+from sqlite_repository import SQLiteTaskRepository
+
+USERS = 100
+TASKS = 100_000
+USER_ID = 1
+
+def load(repo, tasks, now):
+    started = time.perf_counter()
+    for user_id in range(1, USERS + 1):
+        repo.add_user({"username": f"user{user_id}", "created_at": now})
+    for task in tasks:
+        repo.add_task(dict(task))
+    return (time.perf_counter() - started) / len(tasks) * 1e6
+
+def calls(repo, today):
+    week = today + timedelta(days=7)
+    month = today + timedelta(days=30)
+    return {
+        "get_task": lambda: repo.get_task(USER_ID * 10),
+        "update_task": lambda: repo.update_task(USER_ID * 10, {"status": TaskStatus.IN_PROGRESS, "updated_at": datetime.now()}),
+        "get_user": lambda: (repo.get_user(USER_ID), repo.count_user_tasks(USER_ID)),
+        "stats": lambda: (repo.user_stats(USER_ID), repo.count_overdue(USER_ID, today)),
+        "deadlines": lambda: repo.open_tasks_due_by(USER_ID, week),
+        "next 10": lambda: repo.open_tasks_due_by(USER_ID, month, 10),
+        "search word": lambda: repo.search_tasks(USER_ID, "report"),
+        "search page": lambda: repo.search_tasks(USER_ID, "rep", {"priority": TaskPriority.HIGH}, 0, 20),
+        "filters": lambda: repo.search_tasks(USER_ID, None, {"status": TaskStatus.TODO, "tag": "gym"}),
+    }
+
+def main():
+    rng = random.Random(42)
+    now, today = datetime.now(), date.today()
+    tasks = [make_task(rng, rng.randrange(1, USERS + 1), now, today) for _ in range(TASKS)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "tasks.db")
+        memory, sqlite = TaskRepository(), SQLiteTaskRepository(path)
+        insert = {"memory": load(memory, tasks, now), "sqlite": load(sqlite, tasks, now)}
+        started = time.perf_counter()
+        SQLiteTaskRepository(path).user_stats(USER_ID)
+        reopen = (time.perf_counter() - started) * 1e6
+
+        print(f"{TASKS:,} tasks over {USERS} users; user {USER_ID} has {memory.count_user_tasks(USER_ID)}")
+        print("times are per call in microseconds\n")
+        print(f"{'call':<12} {'memory':>10} {'sqlite':>10}")
+        print(f"{'add_task':<12} {insert['memory']:>10.1f} {insert['sqlite']:>10.1f}")
+        sqlite_calls = calls(sqlite, today)
+        for name, fn in calls(memory, today).items():
+            print(f"{name:<12} {per_call_us(fn):>10.1f} {per_call_us(sqlite_calls[name]):>10.1f}")
+        print(f"{'reopen':<12} {'-':>10} {reopen:>10.1f}")
+        print(f"\ndatabase file: {os.path.getsize(path) / 2**20:.1f} MiB")
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,12 @@
 from fastapi import FastAPI, HTTPException, Path, Query, Depends
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel, EmailStr, constr, validator, Field
 from typing import List, Optional, Dict
 from datetime import date, datetime, timedelta
 from enum import Enum
-from collections import defaultdict
+import os
+from repository import TaskRepository, TaskStore
+from sqlite_repository import SQLiteTaskRepository
 
 # Initialize FastAPI app with metadata
 app = FastAPI(
@@ -106,39 +109,41 @@ class Task(TaskBase):
     updated_at: datetime
     reminder_date: Optional[datetime] = None
 
-# Simulated database
-users_db = {}
-tasks_db = {}
-user_id_counter = 1
-task_id_counter = 1
+# Set to a SQLite file path to keep users and tasks across restarts and share them between workers
+DB_PATH = os.environ.get("TASK_TRACKER_DB")
+repo: TaskStore = SQLiteTaskRepository(DB_PATH) if DB_PATH else TaskRepository()
 
 # Helper Functions
-def get_upcoming_deadlines(user_id: int, days: int = 7) -> List[Task]:
-    """Get tasks with deadlines in the next X days"""
+async def run_store(fn, *args):
+    """Calls a store function without blocking the event loop.
+
+    SQLite calls wait on disk and locks, so they run on the threadpool,
+    where each thread keeps its own connection. The in-memory store stays
+    on the event loop, which also keeps it single-threaded.
+    """
+    if isinstance(repo, SQLiteTaskRepository):
+        return await run_in_threadpool(fn, *args)
+    return fn(*args)
+
+def get_upcoming_deadlines(user_id: int, days: int = 7, limit: Optional[int] = None) -> List[Task]:
+    """Get open tasks with deadlines in the next X days, soonest first"""
     future_date = date.today() + timedelta(days=days)
-    return [
-        task for task in tasks_db.values()
-        if task["user_id"] == user_id 
-        and task["due_date"] <= future_date
-        and task["status"] != TaskStatus.COMPLETED
-    ]
+    return repo.open_tasks_due_by(user_id, future_date, limit)
 
 def calculate_user_stats(user_id: int) -> dict:
-    """Calculate task statistics for a user"""
-    user_tasks = [task for task in tasks_db.values() if task["user_id"] == user_id]
+    """Calculate task statistics for a user from the repository's running counters"""
+    counters = repo.user_stats(user_id)
     stats = {
-        "total_tasks": len(user_tasks),
-        "completed_tasks": len([t for t in user_tasks if t["status"] == TaskStatus.COMPLETED]),
-        "urgent_tasks": len([t for t in user_tasks if t["priority"] == TaskPriority.URGENT]),
-        "overdue_tasks": len([t for t in user_tasks if t["due_date"] < date.today() and t["status"] != TaskStatus.COMPLETED]),
-        "tasks_by_category": defaultdict(int),
+        "total_tasks": counters.total,
+        "completed_tasks": counters.by_status[TaskStatus.COMPLETED],
+        "urgent_tasks": counters.by_priority[TaskPriority.URGENT],
+        "overdue_tasks": repo.count_overdue(user_id, date.today()),
+        "tasks_by_category": {category: n for category, n in counters.by_category.items() if n},
         "average_progress": 0
     }
     
-    if user_tasks:
-        stats["average_progress"] = sum(t["progress_percentage"] for t in user_tasks) / len(user_tasks)
-        for task in user_tasks:
-            stats["tasks_by_category"][task["category"]] += 1
+    if counters.total:
+        stats["average_progress"] = counters.progress_sum / counters.total
     
     return stats
 
@@ -146,34 +151,28 @@ def calculate_user_stats(user_id: int) -> dict:
 @app.post("/users/", response_model=UserRead, tags=["Users"])
 async def create_user(user: UserCreate):
     """Create a new user with profile"""
-    global user_id_counter
     user_dict = user.model_dump()
-    user_dict["id"] = user_id_counter
     user_dict["created_at"] = datetime.now()
     user_dict["task_count"] = 0
-    users_db[user_id_counter] = user_dict
-    user_id_counter += 1
-    return user_dict
+    return await run_store(repo.add_user, user_dict)
 
 @app.get("/users/{user_id}", response_model=UserRead, tags=["Users"])
 async def get_user(user_id: int = Path(..., description="The ID of the user to retrieve")):
     """Get user details and profile"""
-    if user_id not in users_db:
+    user = await run_store(repo.get_user, user_id)
+    if user is None:
         raise HTTPException(status_code=404, detail="User not found")
-    user = users_db[user_id]
-    user["task_count"] = len([t for t in tasks_db.values() if t["user_id"] == user_id])
+    user["task_count"] = await run_store(repo.count_user_tasks, user_id)
     return user
 
 # Enhanced Task endpoints
 @app.post("/tasks/", response_model=Task, tags=["Tasks"])
 async def create_task(task: TaskCreate):
     """Create a new task with enhanced features"""
-    global task_id_counter
-    if task.user_id not in users_db:
+    if await run_store(repo.get_user, task.user_id) is None:
         raise HTTPException(status_code=404, detail="User not found")
     
     task_dict = task.model_dump()
-    task_dict["id"] = task_id_counter
     task_dict["created_at"] = datetime.now()
     task_dict["updated_at"] = datetime.now()
     
@@ -183,9 +182,7 @@ async def create_task(task: TaskCreate):
         datetime.min.time()
     )
     
-    tasks_db[task_id_counter] = task_dict
-    task_id_counter += 1
-    return task_dict
+    return await run_store(repo.add_task, task_dict)
 
 @app.put("/tasks/{task_id}", response_model=Task, tags=["Tasks"])
 async def update_task(
@@ -195,39 +192,40 @@ async def update_task(
     priority: Optional[TaskPriority] = Query(None, description="Task priority")
 ):
     """Update task status, progress, and priority"""
-    if task_id not in tasks_db:
+    if await run_store(repo.get_task, task_id) is None:
         raise HTTPException(status_code=404, detail="Task not found")
     
-    task = tasks_db[task_id]
+    changes = {}
     if status:
-        task["status"] = status
+        changes["status"] = status
     if progress is not None:
-        task["progress_percentage"] = progress
+        changes["progress_percentage"] = progress
         if progress == 100:
-            task["status"] = TaskStatus.COMPLETED
+            changes["status"] = TaskStatus.COMPLETED
     if priority:
-        task["priority"] = priority
+        changes["priority"] = priority
     
-    task["updated_at"] = datetime.now()
-    return task
+    changes["updated_at"] = datetime.now()
+    return await run_store(repo.update_task, task_id, changes)
 
 # New Enhanced Endpoints
 @app.get("/users/{user_id}/stats", tags=["Analytics"])
 async def get_user_stats(user_id: int):
     """Get detailed task statistics for a user"""
-    if user_id not in users_db:
+    if await run_store(repo.get_user, user_id) is None:
         raise HTTPException(status_code=404, detail="User not found")
-    return calculate_user_stats(user_id)
+    return await run_store(calculate_user_stats, user_id)
 
 @app.get("/users/{user_id}/deadlines", response_model=List[Task], tags=["Tasks"])
 async def get_upcoming_tasks(
     user_id: int,
-    days: int = Query(7, ge=1, le=30, description="Number of days to look ahead")
+    days: int = Query(7, ge=1, le=30, description="Number of days to look ahead"),
+    limit: Optional[int] = Query(None, ge=1, le=100, description="Return only the next N deadlines")
 ):
-    """Get upcoming task deadlines"""
-    if user_id not in users_db:
+    """Get upcoming task deadlines, sorted by due date"""
+    if await run_store(repo.get_user, user_id) is None:
         raise HTTPException(status_code=404, detail="User not found")
-    return get_upcoming_deadlines(user_id, days)
+    return await run_store(get_upcoming_deadlines, user_id, days, limit)
 
 @app.get("/tasks/search/", response_model=List[Task], tags=["Tasks"])
 async def search_tasks(
@@ -236,24 +234,14 @@ async def search_tasks(
     category: Optional[TaskCategory] = None,
     priority: Optional[TaskPriority] = None,
     status: Optional[TaskStatus] = None,
-    tag: Optional[str] = None
+    tag: Optional[str] = None,
+    offset: int = Query(0, ge=0, description="Number of matches to skip"),
+    limit: Optional[int] = Query(None, ge=1, le=100, description="Maximum number of matches to return")
 ):
-    """Search tasks with multiple filters"""
-    tasks = [t for t in tasks_db.values() if t["user_id"] == user_id]
-    
-    if query:
-        tasks = [t for t in tasks if query.lower() in t["title"].lower() or 
-                (t["description"] and query.lower() in t["description"].lower())]
-    if category:
-        tasks = [t for t in tasks if t["category"] == category]
-    if priority:
-        tasks = [t for t in tasks if t["priority"] == priority]
-    if status:
-        tasks = [t for t in tasks if t["status"] == status]
-    if tag:
-        tasks = [t for t in tasks if tag in t["tags"]]
-    
-    return tasks
+    """Search tasks with multiple filters, best title/description matches first"""
+    filters = {"category": category, "priority": priority, "status": status, "tag": tag}
+    filters = {field: value for field, value in filters.items() if value}
+    return await run_store(repo.search_tasks, user_id, query or None, filters, offset, limit)
 
 # Root endpoint
 @app.get("/")
@@ -0,0 +1,308 @@
+import re
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter
+from datetime import date
+from itertools import chain
+from operator import itemgetter
+from typing import Dict, Iterable, List, Optional, Protocol, Set, Tuple
+
+# TaskStatus.COMPLETED; completed tasks drop out of the due-date index
+COMPLETED = "completed"
+
+# Fields with their own exact-match posting sets; "tag" is one entry per tag
+FILTER_FIELDS = ("category", "priority", "status")
+# Task fields each per-user index is built from, so an update only touches what it changed
+TEXT_FIELDS = frozenset({"title", "description"})
+FILTERED_FIELDS = frozenset({*FILTER_FIELDS, "tags"})
+STATS_FIELDS = frozenset({"status", "priority", "category", "progress_percentage"})
+TITLE_WEIGHT = 2
+DESCRIPTION_WEIGHT = 1
+
+TOKEN = re.compile(r"\w+")
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return TOKEN.findall(text.lower()) if text else []
+
+class TaskStore(Protocol):
+    """Storage the endpoints run on.
+
+    TaskRepository keeps everything in process memory; SQLiteTaskRepository
+    (sqlite_repository.py) keeps it in a SQLite file that survives restarts
+    and can be shared by several workers. Both return plain dicts.
+    """
+
+    def add_user(self, user: dict) -> dict: ...
+    def get_user(self, user_id: int) -> Optional[dict]: ...
+    def add_task(self, task: dict) -> dict: ...
+    def get_task(self, task_id: int) -> Optional[dict]: ...
+    def update_task(self, task_id: int, changes: dict) -> dict: ...
+    def user_tasks(self, user_id: int) -> List[dict]: ...
+    def count_user_tasks(self, user_id: int) -> int: ...
+    def user_stats(self, user_id: int) -> "UserStats": ...
+    def count_overdue(self, user_id: int, today: date) -> int: ...
+    def open_tasks_due_by(self, user_id: int, until: date, limit: Optional[int] = None) -> List[dict]: ...
+    def search_tasks(self, user_id: int, query: Optional[str] = None, filters: Optional[dict] = None,
+                     offset: int = 0, limit: Optional[int] = None) -> List[dict]: ...
+
+class UserStats:
+    """Running totals over one user's tasks, adjusted on every write"""
+
+    def __init__(self):
+        self.total = 0
+        self.progress_sum = 0
+        self.by_status: Counter = Counter()
+        self.by_priority: Counter = Counter()
+        self.by_category: Counter = Counter()
+
+    def add(self, task: dict, sign: int = 1):
+        self.total += sign
+        self.progress_sum += sign * task["progress_percentage"]
+        self.by_status[task["status"]] += sign
+        self.by_priority[task["priority"]] += sign
+        self.by_category[task["category"]] += sign
+
+    def remove(self, task: dict):
+        # Buckets that reach zero are kept so histograms keep first-seen order
+        self.add(task, -1)
+
+class SearchIndex:
+    """Inverted index over one user's tasks.
+
+    ``postings`` maps each title/description token to ``{task_id: weight}``,
+    weighing a title hit above a description hit. ``vocabulary`` keeps the
+    tokens sorted so a query word also matches tokens it is a prefix of.
+    ``filters`` maps ``(field, value)`` pairs for the enum fields and tags
+    to sets of task ids.
+    """
+
+    def __init__(self):
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self.vocabulary: List[str] = []
+        self.filters: Dict[Tuple[str, object], Set[int]] = {}
+
+    def add_terms(self, task: dict):
+        for token, weight in self._weights(task).items():
+            posting = self.postings.get(token)
+            if posting is None:
+                posting = self.postings[token] = {}
+                insort(self.vocabulary, token)
+            posting[task["id"]] = weight
+
+    def remove_terms(self, task: dict):
+        for token in self._weights(task):
+            posting = self.postings[token]
+            del posting[task["id"]]
+            if not posting:
+                del self.postings[token]
+                del self.vocabulary[bisect_left(self.vocabulary, token)]
+
+    def add_filters(self, task: dict, fields: Iterable[str] = FILTERED_FIELDS):
+        for key in self._filter_keys(task, fields):
+            self.filters.setdefault(key, set()).add(task["id"])
+
+    def remove_filters(self, task: dict, fields: Iterable[str] = FILTERED_FIELDS):
+        for key in self._filter_keys(task, fields):
+            ids = self.filters[key]
+            ids.discard(task["id"])
+            if not ids:
+                del self.filters[key]
+
+    @staticmethod
+    def _weights(task: dict) -> Dict[str, int]:
+        weights: Dict[str, int] = {}
+        for token in tokenize(task["title"]):
+            weights[token] = TITLE_WEIGHT
+        for token in set(tokenize(task["description"])):
+            weights[token] = weights.get(token, 0) + DESCRIPTION_WEIGHT
+        return weights
+
+    @staticmethod
+    def _filter_keys(task: dict, fields: Iterable[str]) -> Iterable[Tuple[str, object]]:
+        for field in fields:
+            if field == "tags":
+                for tag in task["tags"]:
+                    yield "tag", tag
+            else:
+                yield field, task[field]
+
+    def _matches(self, word: str) -> Dict[int, int]:
+        """Task ids with a token starting with ``word``, with their best weight"""
+        start = end = bisect_left(self.vocabulary, word)
+        while end < len(self.vocabulary) and self.vocabulary[end].startswith(word):
+            end += 1
+        if end - start == 1:
+            return self.postings[self.vocabulary[start]]
+        # Ascending by weight, so each task keeps its highest weight
+        hits = chain.from_iterable(self.postings[token].items() for token in self.vocabulary[start:end])
+        return dict(sorted(hits, key=itemgetter(1)))
+
+    def search(self, query: Optional[str], filters: Dict[str, object]) -> List[int]:
+        """Returns the ids of matching tasks, best match first.
+
+        Every query word and every filter must match; id sets are
+        intersected smallest first, and weights are only looked up for the
+        tasks that survive. With a query, tasks are ranked by the summed
+        weight of their matching words. Ties and filter-only searches keep
+        creation order.
+        """
+        sets = [self.filters.get((field, value), set()) for field, value in filters.items()]
+        matches = []
+        if query is not None:
+            matches = [self._matches(word) for word in set(tokenize(query))]
+            if not matches:
+                return []
+        sets.extend(match.keys() for match in matches)
+        sets.sort(key=len)
+        ranked = sorted(set(sets[0]).intersection(*sets[1:]))
+
+        # Sorts are stable, so equal scores stay in creation order
+        if len(matches) == 1:
+            ranked.sort(key=matches[0].__getitem__, reverse=True)
+        elif matches:
+            scores = map(sum, zip(*(map(match.__getitem__, ranked) for match in matches)))
+            ranked = [task_id for _, task_id in sorted(zip(scores, ranked), key=itemgetter(0), reverse=True)]
+        return ranked
+
+class TaskRepository:
+    """In-memory TaskStore for users and tasks with per-user indexes.
+
+    ``tasks_by_user`` maps each user id to the ids of their tasks, kept as
+    dict keys so they stay in creation order. Per-user reads walk only that
+    user's tasks instead of scanning every task in the store.
+
+    Each user also has a UserStats of running counters and a sorted
+    ``(due_date, task_id)`` list of their open tasks. Both are updated on
+    every add and update, so statistics never iterate tasks and deadline
+    lookups are range queries. Ties on due date keep creation order. A
+    SearchIndex per user answers /tasks/search/ from posting sets.
+    """
+
+    def __init__(self):
+        self.users: Dict[int, dict] = {}
+        self.tasks: Dict[int, dict] = {}
+        self.tasks_by_user: Dict[int, Dict[int, None]] = {}
+        self.stats_by_user: Dict[int, UserStats] = {}
+        self.open_by_due: Dict[int, List[Tuple[date, int]]] = {}
+        self.search_by_user: Dict[int, SearchIndex] = {}
+        self._next_user_id = 1
+        self._next_task_id = 1
+
+    # Users
+    def add_user(self, user: dict) -> dict:
+        """Stores a new user, assigning its id"""
+        user["id"] = self._next_user_id
+        self.users[user["id"]] = user
+        self.tasks_by_user[user["id"]] = {}
+        self.stats_by_user[user["id"]] = UserStats()
+        self.open_by_due[user["id"]] = []
+        self.search_by_user[user["id"]] = SearchIndex()
+        self._next_user_id += 1
+        return user
+
+    def get_user(self, user_id: int) -> Optional[dict]:
+        return self.users.get(user_id)
+
+    # Tasks
+    def add_task(self, task: dict) -> dict:
+        """Stores a new task, assigning its id and indexing it under its user"""
+        task["id"] = self._next_task_id
+        self.tasks[task["id"]] = task
+        self.tasks_by_user.setdefault(task["user_id"], {})[task["id"]] = None
+        self._index(task)
+        self._next_task_id += 1
+        return task
+
+    def get_task(self, task_id: int) -> Optional[dict]:
+        return self.tasks.get(task_id)
+
+    def update_task(self, task_id: int, changes: dict) -> dict:
+        """Applies field changes to a stored task and returns it.
+
+        Only the indexes built from fields whose values changed are
+        touched: a status change moves the task between posting sets and
+        counters, the text is re-tokenised only for a new title or
+        description, and the due-date entry moves only with a new due date
+        or when the task is completed or reopened.
+        """
+        task = self.tasks[task_id]
+        changed = {field for field, value in changes.items() if task.get(field) != value}
+        due = "due_date" in changed or (
+            "status" in changed and (task["status"] == COMPLETED) != (changes["status"] == COMPLETED)
+        )
+        self._unindex(task, changed, due)
+        task.update(changes)
+        self._index(task, changed, due)
+        return task
+
+    def _index(self, task: dict, fields=None, due=True):
+        """Adds the task to the indexes built from ``fields`` (all of them by default)"""
+        user_id = task["user_id"]
+        if user_id not in self.search_by_user:
+            # A task for a user stored without add_user
+            self.stats_by_user[user_id], self.search_by_user[user_id] = UserStats(), SearchIndex()
+            self.open_by_due[user_id] = []
+        if fields is None or fields & STATS_FIELDS:
+            self.stats_by_user[user_id].add(task)
+        index = self.search_by_user[user_id]
+        if fields is None or fields & TEXT_FIELDS:
+            index.add_terms(task)
+        index.add_filters(task, FILTERED_FIELDS if fields is None else fields & FILTERED_FIELDS)
+        if due and task["status"] != COMPLETED:
+            insort(self.open_by_due[user_id], (task["due_date"], task["id"]))
+
+    def _unindex(self, task: dict, fields, due):
+        """Removes the task from the indexes built from ``fields``"""
+        user_id = task["user_id"]
+        if fields & STATS_FIELDS:
+            self.stats_by_user[user_id].remove(task)
+        index = self.search_by_user[user_id]
+        if fields & TEXT_FIELDS:
+            index.remove_terms(task)
+        index.remove_filters(task, fields & FILTERED_FIELDS)
+        if due and task["status"] != COMPLETED:
+            open_tasks = self.open_by_due[user_id]
+            del open_tasks[bisect_left(open_tasks, (task["due_date"], task["id"]))]
+
+    def user_tasks(self, user_id: int) -> List[dict]:
+        """Returns a user's tasks in creation order"""
+        return [self.tasks[task_id] for task_id in self.tasks_by_user.get(user_id, ())]
+
+    def count_user_tasks(self, user_id: int) -> int:
+        return len(self.tasks_by_user.get(user_id, ()))
+
+    def user_stats(self, user_id: int) -> UserStats:
+        return self.stats_by_user.get(user_id) or UserStats()
+
+    def open_tasks_due_by(self, user_id: int, until: date, limit: Optional[int] = None) -> List[dict]:
+        """Returns a user's open tasks due on or before ``until``, soonest first.
+
+        A range query on the due-date list: one bisection finds the end of
+        the range, and only the tasks returned are looked up.
+        """
+        open_tasks = self.open_by_due.get(user_id, ())
+        end = bisect_right(open_tasks, (until, self._next_task_id))
+        if limit is not None:
+            end = min(end, limit)
+        return [self.tasks[task_id] for _, task_id in open_tasks[:end]]
+
+    def search_tasks(self, user_id: int, query: Optional[str] = None, filters: Optional[dict] = None,
+                     offset: int = 0, limit: Optional[int] = None) -> List[dict]:
+        """Returns one page of a user's tasks matching ``query`` and ``filters``.
+
+        ``filters`` maps category, priority, status or tag to the value
+        required. Without a query or filters every task matches, in
+        creation order.
+        """
+        index = self.search_by_user.get(user_id)
+        if index is None:
+            return []
+        if query is None and not filters:
+            task_ids = list(self.tasks_by_user[user_id])
+        else:
+            task_ids = index.search(query, filters or {})
+        end = None if limit is None else offset + limit
+        return [self.tasks[task_id] for task_id in task_ids[offset:end]]
+
+    def count_overdue(self, user_id: int, today: date) -> int:
+        """Open tasks due before today, counted with one bisection"""
+        return bisect_left(self.open_by_due.get(user_id, ()), (today,))
@@ -0,0 +1,294 @@
+import json
+import sqlite3
+import threading
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+from repository import COMPLETED, DESCRIPTION_WEIGHT, TITLE_WEIGHT, UserStats, tokenize
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    description TEXT,
+    due_date TEXT NOT NULL,
+    status TEXT NOT NULL,
+    priority TEXT NOT NULL,
+    category TEXT NOT NULL,
+    tags TEXT NOT NULL,
+    estimated_hours REAL,
+    progress_percentage INTEGER NOT NULL,
+    created_at TEXT,
+    updated_at TEXT,
+    reminder_date TEXT
+);
+-- Rowids follow each user_id entry, so per-user reads come back in creation order
+CREATE INDEX IF NOT EXISTS tasks_user ON tasks (user_id);
+-- Covers the status filters without touching the table
+CREATE INDEX IF NOT EXISTS tasks_user_status ON tasks (user_id, status, priority, category, progress_percentage);
+-- Running counters per (status, priority, category) group, adjusted in every write's
+-- transaction, as UserStats is in memory. Rowids keep groups in first-seen order
+CREATE TABLE IF NOT EXISTS task_counts (
+    user_id INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    priority TEXT NOT NULL,
+    category TEXT NOT NULL,
+    tasks INTEGER NOT NULL,
+    progress INTEGER NOT NULL,
+    UNIQUE (user_id, status, priority, category)
+);
+-- Open tasks only, in due-date order: overdue counts and deadline ranges
+CREATE INDEX IF NOT EXISTS tasks_open_due ON tasks (user_id, due_date) WHERE status != '{COMPLETED}';
+CREATE TABLE IF NOT EXISTS task_tags (
+    user_id INTEGER NOT NULL,
+    tag TEXT NOT NULL,
+    task_id INTEGER NOT NULL,
+    PRIMARY KEY (user_id, tag, task_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS task_tags_task ON task_tags (task_id);
+-- Inverted index over title/description tokens, as in SearchIndex
+CREATE TABLE IF NOT EXISTS task_terms (
+    user_id INTEGER NOT NULL,
+    term TEXT NOT NULL,
+    task_id INTEGER NOT NULL,
+    weight INTEGER NOT NULL,
+    PRIMARY KEY (user_id, term, task_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS task_terms_task ON task_terms (task_id);
+"""
+
+COLUMNS = (
+    "title", "description", "due_date", "status", "priority", "category", "tags",
+    "estimated_hours", "progress_percentage", "user_id", "created_at", "updated_at", "reminder_date",
+)
+SELECT_TASK = f"SELECT id, {', '.join(COLUMNS)} FROM tasks"
+INSERT_TASK = f"INSERT INTO tasks ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+FILTER_COLUMNS = ("category", "priority", "status")
+STATS_COLUMNS = ("status", "priority", "category", "progress_percentage")
+COUNT_TASKS = (
+    "INSERT INTO task_counts (user_id, status, priority, category, tasks, progress) VALUES (?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT (user_id, status, priority, category) "
+    "DO UPDATE SET tasks = tasks + excluded.tasks, progress = progress + excluded.progress"
+)
+# Fills task_counts for a database written before the table existed
+BACKFILL_COUNTS = (
+    "INSERT INTO task_counts (user_id, status, priority, category, tasks, progress) "
+    "SELECT user_id, status, priority, category, COUNT(*), SUM(progress_percentage) FROM tasks "
+    "GROUP BY user_id, status, priority, category ORDER BY MIN(id)"
+)
+
+def _encode(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    # str enums go in as their plain value
+    return getattr(value, "value", value)
+
+class SQLiteTaskRepository:
+    """TaskStore backed by a SQLite file, shared by every worker process.
+
+    The database runs in WAL mode so readers never block the writer. Each
+    thread keeps its own connection, and every query is parameterised, so
+    sqlite3 prepares each statement shape once per connection and reuses it
+    from its statement cache. Search uses a ``task_terms``
+    table with the same tokens and weights as the in-memory SearchIndex,
+    so both stores rank results identically. Stats read a ``task_counts``
+    table of running counters that every write adjusts in its own
+    transaction, so they cost the same however many tasks a user has.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            if conn.execute("SELECT NOT EXISTS (SELECT 1 FROM task_counts)").fetchone()[0]:
+                conn.execute(BACKFILL_COUNTS)
+
+    def _connect(self) -> sqlite3.Connection:
+        # sqlite3 connections may not cross threads, so keep one per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, cached_statements=256)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # Users
+    def add_user(self, user: dict) -> dict:
+        """Stores a new user, assigning its id"""
+        with self._connect() as conn:
+            cursor = conn.execute("INSERT INTO users (data) VALUES (?)", (json.dumps(user, default=_encode),))
+        user["id"] = cursor.lastrowid
+        return user
+
+    def get_user(self, user_id: int) -> Optional[dict]:
+        row = self._connect().execute("SELECT data FROM users WHERE id = ?", (user_id,)).fetchone()
+        if row is None:
+            return None
+        user = json.loads(row[0])
+        user["id"] = user_id
+        user["created_at"] = datetime.fromisoformat(user["created_at"])
+        return user
+
+    # Tasks
+    def add_task(self, task: dict) -> dict:
+        """Stores a new task, assigning its id and indexing its tags and terms"""
+        with self._connect() as conn:
+            cursor = conn.execute(INSERT_TASK, self._params(task))
+            task["id"] = cursor.lastrowid
+            self._index(conn, task)
+            self._count(conn, task)
+        return task
+
+    def get_task(self, task_id: int) -> Optional[dict]:
+        row = self._connect().execute(f"{SELECT_TASK} WHERE id = ?", (task_id,)).fetchone()
+        return self._task(row) if row else None
+
+    def update_task(self, task_id: int, changes: dict) -> dict:
+        """Applies field changes to a stored task and returns it"""
+        columns = [column for column in changes if column in COLUMNS]
+        with self._connect() as conn:
+            # Take the write lock before reading the old values the counters are adjusted from
+            conn.execute("BEGIN IMMEDIATE")
+            counted = set(columns) & set(STATS_COLUMNS)
+            if counted:
+                before = dict(zip(STATS_COLUMNS, conn.execute(
+                    f"SELECT {', '.join(STATS_COLUMNS)} FROM tasks WHERE id = ?", (task_id,)
+                ).fetchone()))
+            if columns:
+                assignments = ", ".join(f"{column} = ?" for column in columns)
+                values = [json.dumps(changes[column]) if column == "tags" else _encode(changes[column]) for column in columns]
+                conn.execute(f"UPDATE tasks SET {assignments} WHERE id = ?", (*values, task_id))
+            task = self._task(conn.execute(f"{SELECT_TASK} WHERE id = ?", (task_id,)).fetchone())
+            if counted:
+                self._count(conn, {**before, "user_id": task["user_id"]}, -1)
+                self._count(conn, task)
+            if {"title", "description", "tags"} & set(columns):
+                conn.execute("DELETE FROM task_tags WHERE task_id = ?", (task_id,))
+                conn.execute("DELETE FROM task_terms WHERE task_id = ?", (task_id,))
+                self._index(conn, task)
+        return task
+
+    @staticmethod
+    def _params(task: dict) -> tuple:
+        return tuple(json.dumps(task["tags"]) if column == "tags" else _encode(task.get(column)) for column in COLUMNS)
+
+    @staticmethod
+    def _index(conn: sqlite3.Connection, task: dict):
+        weights: Dict[str, int] = {}
+        for token in tokenize(task["title"]):
+            weights[token] = TITLE_WEIGHT
+        for token in set(tokenize(task["description"])):
+            weights[token] = weights.get(token, 0) + DESCRIPTION_WEIGHT
+        conn.executemany(
+            "INSERT INTO task_terms (user_id, term, task_id, weight) VALUES (?, ?, ?, ?)",
+            [(task["user_id"], token, task["id"], weight) for token, weight in weights.items()],
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO task_tags (user_id, tag, task_id) VALUES (?, ?, ?)",
+            [(task["user_id"], tag, task["id"]) for tag in task["tags"]],
+        )
+
+    @staticmethod
+    def _count(conn: sqlite3.Connection, task: dict, sign: int = 1):
+        # Groups that reach zero are kept so histograms keep first-seen order
+        conn.execute(COUNT_TASKS, (
+            task["user_id"], _encode(task["status"]), _encode(task["priority"]), _encode(task["category"]),
+            sign, sign * task["progress_percentage"],
+        ))
+
+    @staticmethod
+    def _task(row: tuple) -> dict:
+        task = dict(zip(("id", *COLUMNS), row))
+        task["due_date"] = date.fromisoformat(task["due_date"])
+        task["tags"] = json.loads(task["tags"])
+        for column in ("created_at", "updated_at", "reminder_date"):
+            if task[column] is not None:
+                task[column] = datetime.fromisoformat(task[column])
+        return task
+
+    def user_tasks(self, user_id: int) -> List[dict]:
+        """Returns a user's tasks in creation order"""
+        rows = self._connect().execute(f"{SELECT_TASK} WHERE user_id = ? ORDER BY id", (user_id,))
+        return [self._task(row) for row in rows]
+
+    def count_user_tasks(self, user_id: int) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM tasks WHERE user_id = ?", (user_id,)).fetchone()[0]
+
+    def user_stats(self, user_id: int) -> UserStats:
+        """Reads a user's counters from task_counts; at most one row per status, priority and category"""
+        stats = UserStats()
+        rows = self._connect().execute(
+            "SELECT status, priority, category, tasks, progress FROM task_counts WHERE user_id = ? ORDER BY rowid",
+            (user_id,),
+        )
+        # Groups come in the order they were first counted, so categories keep first-seen order
+        for status, priority, category, count, progress in rows:
+            stats.total += count
+            stats.progress_sum += progress
+            stats.by_status[status] += count
+            stats.by_priority[priority] += count
+            stats.by_category[category] += count
+        return stats
+
+    def count_overdue(self, user_id: int, today: date) -> int:
+        return self._connect().execute(
+            f"SELECT COUNT(*) FROM tasks WHERE user_id = ? AND status != '{COMPLETED}' AND due_date < ?",
+            (user_id, today.isoformat()),
+        ).fetchone()[0]
+
+    def open_tasks_due_by(self, user_id: int, until: date, limit: Optional[int] = None) -> List[dict]:
+        """Returns a user's open tasks due on or before ``until``, soonest first"""
+        rows = self._connect().execute(
+            f"{SELECT_TASK} WHERE user_id = ? AND status != '{COMPLETED}' AND due_date <= ? "
+            "ORDER BY due_date, id LIMIT ?",
+            (user_id, until.isoformat(), -1 if limit is None else limit),
+        )
+        return [self._task(row) for row in rows]
+
+    def search_tasks(self, user_id: int, query: Optional[str] = None, filters: Optional[dict] = None,
+                     offset: int = 0, limit: Optional[int] = None) -> List[dict]:
+        """Returns one page of a user's tasks matching ``query`` and ``filters``.
+
+        Each query word joins the best-weighted ``task_terms`` row among
+        the tokens it prefixes. Tokens are ``\\w`` runs, so a word needs no
+        escaping in its GLOB pattern and SQLite reads it as an index range.
+        """
+        joins, scores, params = [], [], []
+        if query is not None:
+            words = set(tokenize(query))
+            if not words:
+                return []
+            for n, word in enumerate(sorted(words)):
+                joins.append(
+                    f"JOIN (SELECT task_id, MAX(weight) AS weight FROM task_terms "
+                    f"WHERE user_id = ? AND term GLOB ? GROUP BY task_id) w{n} ON w{n}.task_id = t.id"
+                )
+                scores.append(f"w{n}.weight")
+                params += [user_id, f"{word}*"]
+
+        conditions = ["t.user_id = ?"]
+        params.append(user_id)
+        for field, value in (filters or {}).items():
+            if field in FILTER_COLUMNS:
+                conditions.append(f"t.{field} = ?")
+            elif field == "tag":
+                conditions.append("t.id IN (SELECT task_id FROM task_tags WHERE user_id = ? AND tag = ?)")
+                params.append(user_id)
+            else:
+                raise ValueError(f"Unknown search filter: {field}")
+            params.append(_encode(value))
+
+        order = f"{' + '.join(scores)} DESC, t.id" if scores else "t.id"
+        sql = (
+            f"SELECT t.id, {', '.join(f't.{column}' for column in COLUMNS)} FROM tasks t {' '.join(joins)} "
+            f"WHERE {' AND '.join(conditions)} ORDER BY {order} LIMIT ? OFFSET ?"
+        )
+        params += [-1 if limit is None else limit, offset]
+        return [self._task(row) for row in self._connect().execute(sql, params)]